@@ -1,9 +1,10 @@
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
-from PyQt5.QtCore import QPoint, QRegExp, Qt
+from PyQt5.QtCore import QPoint, QRect, QRegExp, Qt, QThreadPool, QTimer
 from PyQt5.QtGui import QImage, QPixmap, QRegExpValidator
 from PyQt5.QtWidgets import (
+    QCheckBox,
     QDialog,
     QFormLayout,
     QFrame,
@@ -19,6 +20,7 @@ from PyQt5.QtWidgets import (
 
 from musa.model.types import Point, Size
 from musa.util.image import Image
+from musa.util.sprite_extractor import RegionSignals, RegionWorker, SpriteExtractor
 from musa.widget.button import AlphaColorPickerButton
 from musa.widget.slider import RoundHandleSlider
 from musa.widget.viewer import ScrollImageViewer
@@ -38,6 +40,26 @@ class SpriteSheetDialog(QDialog):
         self.offset = Point(0, 0)
         self.spacing = Point(0, 0)
 
+        # Auto slice bounds, found on the thread pool again when the image changes.
+        # Results of a request made before the last change are dropped.
+        self.regions: Optional[List[QRect]] = None
+        self.regions_request = 0
+        self.regions_pending = False
+        self.region_signals = RegionSignals(self)
+        self.region_signals.regionsFound.connect(self._on_regions_found)
+
+        # Preview layers, kept apart by the viewer so only the overlay follows
+        # the slicing values
+        self.background: Optional[QPixmap] = None
+        self.overlay: Optional[QPixmap] = None
+        self.overlay_params: Optional[tuple] = None
+
+        # Coalesce bursts of value changes into a single repaint
+        self.display_timer = QTimer(self)
+        self.display_timer.setSingleShot(True)
+        self.display_timer.setInterval(0)
+        self.display_timer.timeout.connect(self.update_display)
+
         self.setup_ui()
 
         self.update_display()
@@ -98,7 +120,7 @@ class SpriteSheetDialog(QDialog):
         self.alpha_btn.clicked.connect(lambda clicked: self.pick_alpha())
 
         # Frame size input
-        frame_size_group = QGroupBox("Size")
+        self.frame_size_group = QGroupBox("Size")
         size_layout = QFormLayout()
 
         self.width_spin = QSpinBox()
@@ -115,11 +137,11 @@ class SpriteSheetDialog(QDialog):
         self.height_spin.valueChanged.connect(self.update_size)
         size_layout.addRow("Height:", self.height_spin)
 
-        frame_size_group.setLayout(size_layout)
-        right_layout.addWidget(frame_size_group)
+        self.frame_size_group.setLayout(size_layout)
+        right_layout.addWidget(self.frame_size_group)
 
         # Offset input
-        offset_group = QGroupBox("Offset")
+        self.offset_group = QGroupBox("Offset")
         offset_layout = QFormLayout()
 
         self.offset_x_spin = QSpinBox()
@@ -134,11 +156,11 @@ class SpriteSheetDialog(QDialog):
         self.offset_y_spin.valueChanged.connect(self.update_size)
         offset_layout.addRow("Y:", self.offset_y_spin)
 
-        offset_group.setLayout(offset_layout)
-        right_layout.addWidget(offset_group)
+        self.offset_group.setLayout(offset_layout)
+        right_layout.addWidget(self.offset_group)
 
         # Spacing input
-        spacing_group = QGroupBox("Spacing")
+        self.spacing_group = QGroupBox("Spacing")
         spacing_layout = QFormLayout()
 
         self.spacing_x_spin = QSpinBox()
@@ -153,8 +175,8 @@ class SpriteSheetDialog(QDialog):
         self.spacing_y_spin.valueChanged.connect(self.update_size)
         spacing_layout.addRow("Y:", self.spacing_y_spin)
 
-        spacing_group.setLayout(spacing_layout)
-        right_layout.addWidget(spacing_group)
+        self.spacing_group.setLayout(spacing_layout)
+        right_layout.addWidget(self.spacing_group)
 
         # Base name input
         name_group = QGroupBox("Name")
@@ -165,14 +187,34 @@ class SpriteSheetDialog(QDialog):
         name_layout.addWidget(self.base_name)
         name_group.setLayout(name_layout)
         right_layout.addWidget(name_group)
+
+        # Extraction options
+        options_group = QGroupBox("Options")
+        options_layout = QVBoxLayout()
+
+        self.deduplicate_check = QCheckBox("Merge duplicates")
+        self.deduplicate_check.setToolTip(
+            "Keep a single copy of repeated sprites, mirrored copies included"
+        )
+        self.deduplicate_check.setChecked(True)
+        options_layout.addWidget(self.deduplicate_check)
+
+        self.auto_slice_check = QCheckBox("Auto slice")
+        self.auto_slice_check.setToolTip(
+            "Find every sprite from its opaque pixels instead of a fixed grid"
+        )
+        self.auto_slice_check.toggled.connect(self.update_mode)
+        options_layout.addWidget(self.auto_slice_check)
+        options_group.setLayout(options_layout)
+        right_layout.addWidget(options_group)
         right_layout.addStretch()
 
         # Buttons
         button_layout = QHBoxLayout()
         button_layout.addStretch()
-        extract_btn = QPushButton("Extract")
-        extract_btn.clicked.connect(self.validate_extract)
-        button_layout.addWidget(extract_btn)
+        self.extract_btn = QPushButton("Extract")
+        self.extract_btn.clicked.connect(self.validate_extract)
+        button_layout.addWidget(self.extract_btn)
 
         cancel_btn = QPushButton("Cancel")
         cancel_btn.clicked.connect(self.reject)
@@ -197,30 +239,93 @@ class SpriteSheetDialog(QDialog):
 
         # Update the image
         self.image = Image.remove_background(self.image, color)
+        self.regions = None
+        self.regions_pending = False
+        self.regions_request += 1
+        self.background = None
+        self.overlay_params = None
         self.update_display()
 
+    def update_mode(self, auto_slice: bool):
+        self.frame_size_group.setEnabled(not auto_slice)
+        self.offset_group.setEnabled(not auto_slice)
+        self.spacing_group.setEnabled(not auto_slice)
+        self.display_timer.start()
+
+    def get_regions(self) -> Optional[List[QRect]]:
+        """Auto slice bounds, None while they are being found"""
+        if self.regions is None and not self.regions_pending:
+            self.regions_pending = True
+            worker = RegionWorker(self.image, self.regions_request, self.region_signals)
+            QThreadPool.globalInstance().start(worker)
+        return self.regions
+
+    def _on_regions_found(self, request: int, regions: List[QRect]):
+        if request != self.regions_request:
+            return
+
+        self.regions = regions
+        self.regions_pending = False
+        self.display_timer.start()
+
     def update_size(self):
         self.frame_size = Size(self.width_spin.value(), self.height_spin.value())
         self.offset = Point(self.offset_x_spin.value(), self.offset_y_spin.value())
         self.spacing = Point(self.spacing_x_spin.value(), self.spacing_y_spin.value())
-        self.update_display()
+        self.display_timer.start()
 
     def update_display(self):
-        pixmap = QPixmap.fromImage(self.image)
-        grid = Image.grid(
-            pixmap.size(),
-            self.frame_size.w,
-            self.frame_size.h,
-            self.offset.x,
-            self.offset.y,
-            self.spacing.x,
-            self.spacing.y,
-        )
-
-        result = Image.flatten([self.checker, pixmap, grid], pixmap.size())
-        self.img_viewer.setPixmap(result)
+        size = self.image.size()
+
+        if self.background is None:
+            pixmap = QPixmap.fromImage(self.image)
+            self.background = Image.flatten([self.checker, pixmap], size)
+            self.img_viewer.setPixmap(self.background)
+
+        # Nothing to show nor extract until the regions are found
+        regions = None
+        if self.auto_slice_check.isChecked():
+            regions = self.get_regions()
+            params = ("auto",) if regions is not None else ("pending",)
+        else:
+            params = (*self.frame_size, *self.offset, *self.spacing)
+        self.extract_btn.setEnabled(params != ("pending",))
+
+        # Only the overlay depends on the slicing values
+        if params != self.overlay_params:
+            self.overlay_params = params
+            if params == ("pending",):
+                self.overlay = None
+            elif regions is not None:
+                self.overlay = Image.regions(size, regions)
+            else:
+                self.overlay = Image.grid(
+                    size,
+                    self.frame_size.w,
+                    self.frame_size.h,
+                    self.offset.x,
+                    self.offset.y,
+                    self.spacing.x,
+                    self.spacing.y,
+                )
+            self.img_viewer.set_overlay(self.overlay)
 
     def validate_extract(self):
+        if self.auto_slice_check.isChecked():
+            regions = self.get_regions()
+            if regions is None:
+                return
+            if not regions:
+                QMessageBox.warning(
+                    self,
+                    "No Sprites",
+                    "The image has no opaque pixels to extract!",
+                )
+                return
+
+            self.accept()
+            return
+
         width = self.width_spin.value()
         height = self.height_spin.value()
 
@@ -234,11 +339,23 @@ class SpriteSheetDialog(QDialog):
 
         self.accept()
 
-    def get_sprites(self) -> List[QPixmap]:
-        return Image.extract_sprites(
+    def create_extractor(self, parent=None) -> SpriteExtractor:
+        if self.auto_slice_check.isChecked():
+            return SpriteExtractor.from_regions(
+                self.image,
+                self.get_regions(),
+                self.deduplicate_check.isChecked(),
+                parent,
+            )
+
+        return SpriteExtractor.from_grid(
             self.image,
             self.frame_size.w,
             self.frame_size.h,
             self.offset.x,
             self.offset.y,
+            self.spacing.x,
+            self.spacing.y,
+            self.deduplicate_check.isChecked(),
+            parent,
         )
@@ -0,0 +1,169 @@
+import os
+import zlib
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PyQt5.QtCore import (
+    QObject,
+    QRunnable,
+    QStandardPaths,
+    QThreadPool,
+    QTimer,
+    pyqtSignal,
+)
+
+from musa.model.animation_collection import AnimationCollection
+from musa.model.project_file import pack_project
+from musa.model.snapshot import CollectionSnapshot, Snapshotter
+
+
+class AutoSaveSignals(QObject):
+    saved = pyqtSignal(str)  # autosave file
+    failed = pyqtSignal(str)  # error message
+
+
+class AutoSaveWorker(QRunnable):
+    """Pack, compress and durably write a snapshot, off the GUI thread"""
+
+    def __init__(
+        self,
+        snapshot: CollectionSnapshot,
+        images: List[bytes],
+        path: Path,
+        signals: AutoSaveSignals,
+    ):
+        super().__init__()
+        self.snapshot = snapshot
+        self.images = images
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        data = pack_project(
+            [
+                (
+                    animation.id.bytes,
+                    animation.name,
+                    [(frame.id.bytes, frame.chunk) for frame in animation.frames],
+                )
+                for animation in self.snapshot
+            ],
+            self.images,
+        )
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, "wb") as file:
+                file.write(zlib.compress(data))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.signals.failed.emit(str(e))
+            return
+
+        self.signals.saved.emit(str(self.path))
+
+
+class AutoSaver(QObject):
+    """Periodically save the collection next to the project file.
+
+    Snapshots are taken on the GUI thread and share the unchanged frames with
+    the previous one. The rest of the work happens on the thread pool.
+    """
+
+    INTERVAL = 2 * 60 * 1000
+    SUFFIX = ".autosave"
+
+    def __init__(self, collection: AnimationCollection, parent=None):
+        super().__init__(parent)
+        self.collection = collection
+        self.project_path: Optional[Path] = None
+
+        self.signals = AutoSaveSignals(self)
+        self.signals.saved.connect(self._on_saved)
+        self.signals.failed.connect(self._on_failed)
+
+        self.snapshotter = Snapshotter()
+        self._last: Optional[Tuple[CollectionSnapshot, int]] = None
+        self._running = False
+        self._discard_pending = False
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.save)
+        self.timer.start(self.INTERVAL)
+
+        # Cached chunks may not match frames loaded from somewhere else
+        self.collection.signals.collectionLoaded.connect(self.reset)
+
+    def set_project_path(self, path: Optional[Path]):
+        self.project_path = path
+
+    @property
+    def path(self) -> Path:
+        if self.project_path:
+            return self.project_path.with_name(self.project_path.name + self.SUFFIX)
+        return self.untitled_path()
+
+    @classmethod
+    def untitled_path(cls) -> Path:
+        """Autosave of the work that was never saved to a project file"""
+        location = QStandardPaths.writableLocation(QStandardPaths.AppLocalDataLocation)
+        Path(location).mkdir(parents=True, exist_ok=True)
+        return Path(location) / f"untitled.musa{cls.SUFFIX}"
+
+    def reset(self):
+        self.snapshotter.reset()
+        self._last = None
+
+    def snapshot(self) -> CollectionSnapshot:
+        return self.snapshotter.freeze(self.collection.list_animations())
+
+    def _state(self) -> Tuple[CollectionSnapshot, int]:
+        # Images are only ever added, their count tells whether any were
+        return self.snapshot(), len(self.collection.sprite_bank)
+
+    def save(self):
+        # Nothing open, nothing to protect
+        if self._running or not (self.project_path or self.collection.animations):
+            return
+
+        state = self._state()
+        if state == self._last:
+            return
+        self._last = state
+
+        # Encoded images are immutable, a copy of the list is enough
+        images = list(self.collection.sprite_bank.images)
+        self._running = True
+        QThreadPool.globalInstance().start(
+            AutoSaveWorker(state[0], images, self.path, self.signals)
+        )
+
+    def discard(self):
+        """Drop the autosave once the project itself was saved"""
+        self.path.unlink(missing_ok=True)
+
+        # The saved state needs no autosave until something changes again
+        self._last = self._state()
+
+        # A save still running would bring the stale autosave back
+        self._discard_pending = self._running
+
+    def _on_saved(self, path: str):
+        self._running = False
+        if self._discard_pending:
+            self._discard_pending = False
+            Path(path).unlink(missing_ok=True)
+
+    def _on_failed(self, message: str):
+        self._running = False
+        self._discard_pending = False
+
+    @staticmethod
+    def restore(autosave_path: Path, target_path: Path):
+        """Decompress an autosave into a project file that can be opened"""
+        with open(autosave_path, "rb") as file:
+            data = zlib.decompress(file.read())
+        with open(target_path, "wb") as file:
+            file.write(data)
@@ -0,0 +1,155 @@
+from enum import Enum
+from typing import Optional
+
+from PyQt5.QtCore import QElapsedTimer, QObject, Qt, QTimer, pyqtSignal
+
+from musa.model.animation import Animation
+
+
+class PlaybackRate(Enum):
+    CUSTOM = 0  # ticks per second set by the user
+    NTSC = 60
+    PAL = 50
+
+
+class PlaybackEngine(QObject):
+    """Play an animation in real time, one frame tick per rate period.
+
+    The frame to show is worked out from the time elapsed since playback
+    started, not by counting timer shots, so late timers never add up to drift.
+    When the GUI falls behind the frames that were due meanwhile are skipped.
+    """
+
+    frameChanged = pyqtSignal(int)  # row of the frame to show
+    playingChanged = pyqtSignal(bool)
+    fpsMeasured = pyqtSignal(float)  # frames actually shown per second
+
+    FPS_WINDOW = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.animation: Optional[Animation] = None
+        self.rate = PlaybackRate.CUSTOM
+        self.custom_fps = 16
+        self.row = 0
+        self.skipped = 0
+
+        self._clock = QElapsedTimer()
+        self._start_tick = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._advance)
+
+        self._shown = 0
+        self._fps_clock = QElapsedTimer()
+
+    @property
+    def ticks_per_second(self) -> int:
+        if self.rate == PlaybackRate.CUSTOM:
+            return self.custom_fps
+        return self.rate.value
+
+    def is_playing(self) -> bool:
+        return self._clock.isValid()
+
+    def set_animation(self, animation: Optional[Animation]):
+        self.pause()
+        self.animation = animation
+        self.row = 0
+
+    def set_rate(self, rate: PlaybackRate, custom_fps: Optional[int] = None):
+        # Carry on from the current tick at the new speed
+        tick = self._current_tick() if self.is_playing() else None
+        self.rate = rate
+        if custom_fps is not None:
+            self.custom_fps = custom_fps
+        if tick is not None:
+            self._restart(tick)
+
+    def play(self):
+        if self.is_playing() or not self.animation or not self.animation.total_ticks:
+            return
+
+        self.row = min(self.row, len(self.animation.frames) - 1)
+        self._shown = 0
+        self._fps_clock.start()
+        self._restart(self.animation.start_tick(self.row))
+        self.playingChanged.emit(True)
+
+    def pause(self):
+        if not self.is_playing():
+            return
+
+        self._timer.stop()
+        self._clock.invalidate()
+        self.playingChanged.emit(False)
+
+    def stop(self):
+        self.pause()
+        self.seek(0)
+
+    def step(self, offset: int):
+        """Show the next or previous frames, wrapping around"""
+        if self.animation and self.animation.frames:
+            self.seek((self.row + offset) % len(self.animation.frames))
+
+    def seek(self, row: int):
+        if not self.animation or not 0 <= row < len(self.animation.frames):
+            return
+
+        self._show(row)
+        if self.is_playing():
+            self._restart(self.animation.start_tick(row))
+
+    def _restart(self, tick: int):
+        self._start_tick = tick
+        self._clock.start()
+        self._schedule()
+
+    def _current_tick(self) -> int:
+        return self._start_tick + self._clock.elapsed() * self.ticks_per_second // 1000
+
+    def _advance(self):
+        row = self.animation.row_at_tick(self._current_tick(), loop=True)
+        if row is None:
+            self.pause()
+            return
+
+        if row != self.row:
+            # Frames that were due while we were late are never shown
+            frames = len(self.animation.frames)
+            self.skipped += (row - self.row - 1) % frames
+            self._show(row)
+        self._schedule()
+
+    def _schedule(self):
+        # Wake up when the next frame is due, measured from the start of playback
+        total = self.animation.total_ticks
+        if not total or self.row >= len(self.animation.frames):
+            self.pause()
+            return
+
+        tick = self._current_tick()
+        next_tick = tick - tick % total + self.animation.start_tick(self.row + 1)
+        if next_tick <= tick:
+            next_tick += total
+
+        # Rounded up, waking early would only spin until the tick comes
+        due = -(-(next_tick - self._start_tick) * 1000 // self.ticks_per_second)
+        self._timer.start(max(0, due - self._clock.elapsed()))
+
+    def _show(self, row: int):
+        self.row = row
+        self.frameChanged.emit(row)
+
+        if not self.is_playing():
+            return
+
+        self._shown += 1
+        elapsed = self._fps_clock.elapsed()
+        if elapsed >= self.FPS_WINDOW:
+            self.fpsMeasured.emit(self._shown * 1000 / elapsed)
+            self._shown = 0
+            self._fps_clock.restart()
@@ -1,9 +1,13 @@
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from typing import Any, Dict, Iterator, List, Optional, Set
 from uuid import UUID
 
+from . import history, journal
 from .frame import Frame
+from .frame_codec import TICKS_SIZE, decode_ticks, encode_frame
 from .iterator import CollectionIterator, I
+from .lazy_frames import LazyFrameList
 from .observable import AnimationSignals
 from .serializable import Serializable, T
 
@@ -14,56 +18,160 @@ class Animation(Serializable):
     frames: List[Frame] = field(default_factory=list)
     signals: AnimationSignals = field(default_factory=AnimationSignals, init=False)
     _modified_frames: Set[UUID] = field(default_factory=set, init=False)
+    _frame_rows: Dict[UUID, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # Tick at which each frame ends, valid for a prefix of the frames
+    _tick_ends: List[int] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self._reindex_frames()
+        for frame in self._loaded_frames():
+            frame.attach()
 
     @classmethod
     def from_dict(cls: type[T], data: Dict[str, Any]) -> "Animation":
-        frames_data = data.pop("frames", [])
-        animation = super().from_dict(data)
-        animation.frames = [Frame.from_dict(f) for f in frames_data]
-        return animation
+        data["frames"] = [Frame.from_dict(f) for f in data.get("frames", [])]
+        return super().from_dict(data)
+
+    def _reindex_frames(self, start: int = 0):
+        # Lazy frames know their ids without being decoded
+        if isinstance(self.frames, LazyFrameList):
+            ids = self.frames.frame_ids()
+        else:
+            ids = [frame.id for frame in self.frames]
+
+        for row in range(start, len(ids)):
+            self._frame_rows[ids[row]] = row
+
+    def _loaded_frames(self) -> Iterator[Frame]:
+        # Frames still in the file can't have been modified
+        if isinstance(self.frames, LazyFrameList):
+            return self.frames.loaded_frames()
+        return iter(self.frames)
 
     def add_frame(self, frame: Frame) -> None:
-        self.frames.append(frame)
-        self.signals.frameAdded.emit(self.id)
-        self.signals.animationModified.emit(self.id)
+        self.insert_frame(len(self.frames), frame)
+
+    def insert_frame(self, row: int, frame: Frame) -> None:
+        self.frames.insert(row, frame)
+        frame.attach()
+        self._reindex_frames(row)
+        del self._tick_ends[row:]
+
+        if journal.is_recording():
+            journal.record(journal.Op.INSERT_FRAME, self.id, row, encode_frame(frame))
+        history.record(history.FrameAdded(self, row, frame))
+
+        self.signals.notify("frameAdded", self.id, frame.id, row)
 
     def remove_frame(self, frame_id: UUID) -> Optional[Frame]:
-        for i, frame in enumerate(self.frames):
-            if frame.id == frame_id:
-                frame = self.frames.pop(i)
-                self.signals.frameRemoved.emit(self.id, frame_id)
-                self.signals.animationModified.emit(self.id)
-                return frame
+        row = self.frame_row(frame_id)
+        if row is None:
+            return None
+
+        frame = self.frames.pop(row)
+        frame.attach(False)
+        del self._frame_rows[frame_id]
+        self._reindex_frames(row)
+        del self._tick_ends[row:]
+        journal.record(journal.Op.REMOVE_FRAME, self.id, frame_id)
+        history.record(history.FrameRemoved(self, row, frame))
+
+        self.signals.notify("frameRemoved", self.id, frame_id, row)
+        return frame
+
+    def frame_row(self, frame_id: UUID) -> Optional[int]:
+        row = self._frame_rows.get(frame_id)
+        if row is not None and row < len(self.frames):
+            if self._frame_id(row) == frame_id:
+                return row
+
+        # The frames list was changed behind our back, rebuild the index
+        if len(self._frame_rows) != len(self.frames) or row is not None:
+            self._frame_rows.clear()
+            self._reindex_frames()
+            return self._frame_rows.get(frame_id)
         return None
 
+    def _frame_id(self, row: int) -> UUID:
+        if isinstance(self.frames, LazyFrameList):
+            return self.frames.frame_ids()[row]
+        return self.frames[row].id
+
     def get_frame(self, frame_id: UUID) -> Optional[Frame]:
-        return next((f for f in self.frames if f.id == frame_id), None)
+        row = self.frame_row(frame_id)
+        return self.frames[row] if row is not None else None
 
     def update_frame(self, frame_id: UUID, **kwargs) -> bool:
         if frame := self.get_frame(frame_id):
+            kwargs = {
+                key: value for key, value in kwargs.items() if hasattr(frame, key)
+            }
+            old = {key: getattr(frame, key) for key in kwargs}
+            payload = journal.encode(self.id, frame_id, kwargs)
             for key, value in kwargs.items():
-                if hasattr(frame, key):
-                    setattr(frame, key, value)
-            self.signals.frameModified.emit(self.id, frame_id)
-            self.signals.animationModified.emit(self.id)
+                setattr(frame, key, value)
+            if "ticks" in kwargs:
+                del self._tick_ends[self.frame_row(frame_id) :]
+            frame.touch()
+            self._modified_frames.add(frame_id)
+            journal.write(journal.Op.UPDATE_FRAME, payload)
+            history.record(history.FrameUpdated(self, frame_id, old, kwargs))
+            self.signals.notify("frameModified", self.id, frame_id)
             return True
         return False
 
     def mark_frame_modified(self, frame_id: UUID):
         self._modified_frames.add(frame_id)
-        self.signals.frameModified.emit(self.id, frame_id)
-        self.signals.animationModified.emit(self.id)
+        self.signals.notify("frameModified", self.id, frame_id)
 
-    def commit_frame_changes(self):
-        for frame in self.frames:
+    def commit_frame_changes(self) -> Set[UUID]:
+        """Close the current set of changes, returns the ids of modified frames"""
+        for frame in self._loaded_frames():
             if frame.is_modified:
                 self.mark_frame_modified(frame.id)
             frame.clear_modified_flag()
-        self._modified_frames.clear()
+
+        modified = self._modified_frames
+        self._modified_frames = set()
+        return modified
+
+    def _frame_ticks(self, row: int) -> int:
+        # Frames still in the file have their ticks read from the chunk header
+        if isinstance(self.frames, LazyFrameList) and not self.frames.is_loaded(row):
+            return decode_ticks(self.frames.peek(row, TICKS_SIZE))
+        return self.frames[row].ticks
+
+    def _update_tick_ends(self) -> List[int]:
+        ends = self._tick_ends
+        end = ends[-1] if ends else 0
+        for row in range(len(ends), len(self.frames)):
+            end += self._frame_ticks(row)
+            ends.append(end)
+        return ends
 
     @property
     def total_ticks(self) -> int:
-        return sum(frame.ticks for frame in self.frames)
+        ends = self._update_tick_ends()
+        return ends[-1] if ends else 0
+
+    def start_tick(self, row: int) -> int:
+        """Tick at which the frame at row starts showing"""
+        return self._update_tick_ends()[row - 1] if row > 0 else 0
+
+    def row_at_tick(self, tick: int, loop: bool = False) -> Optional[int]:
+        """Row of the frame showing at tick, None past the end unless looping"""
+        ends = self._update_tick_ends()
+        if not ends or tick < 0 or (tick >= ends[-1] and not loop):
+            return None
+        return bisect_right(ends, tick % ends[-1])
+
+    def frame_at_tick(self, tick: int, loop: bool = False) -> Optional[Frame]:
+        row = self.row_at_tick(tick, loop)
+        return self.frames[row] if row is not None else None
 
     def __iter__(self) -> Iterator[I]:
         return CollectionIterator(self.frames)
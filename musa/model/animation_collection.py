@@ -1,14 +1,22 @@
-from typing import Any, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
 from uuid import UUID
 
+from . import history, journal, observable
 from .animation import Animation
+from .frame import Frame
+from .frame_codec import decode_frame, encode_frame
 from .iterator import CollectionIterator, I
 from .observable import CollectionSignals
+from .snapshot import CollectionSnapshot, Snapshotter
+from .sprite import Sprite
+from .sprite_bank import SpriteBank
 
 
 class AnimationCollection:
     def __init__(self) -> None:
         self.animations: Dict[UUID, Animation] = {}
+        self.sprite_bank = SpriteBank()
         self.signals = CollectionSignals()
 
     def to_dict(self) -> Dict[str, Any]:
@@ -24,34 +32,148 @@ class AnimationCollection:
         ) in animations_data.items():
             animation = Animation.from_dict(anim_data)
             collection.animations[UUID(anim_id)] = animation
-        collection.signals.collectionLoaded.emit()
+        collection.signals.notify("collectionLoaded")
         return collection
 
+    def freeze(self) -> CollectionSnapshot:
+        """Immutable, picklable copy of the animations for other processes"""
+        return Snapshotter().freeze(self.list_animations())
+
+    @classmethod
+    def thaw(cls, snapshot: CollectionSnapshot) -> "AnimationCollection":
+        collection = cls()
+        collection.load_animations([animation.thaw() for animation in snapshot])
+        return collection
+
+    def load_animations(
+        self, animations: List[Animation], images: Iterable[bytes] = ()
+    ):
+        self.animations = {animation.id: animation for animation in animations}
+        self.sprite_bank.load(images)
+        self.signals.notify("collectionLoaded")
+
     def create_animation(self, name: str) -> Animation:
         animation = Animation(name=name)
-        self.animations[animation.id] = animation
-        self.signals.animationAdded.emit(animation.id)
+        self.add_animation(animation)
         return animation
 
+    def add_animation(self, animation: Animation):
+        self.animations[animation.id] = animation
+
+        if journal.is_recording():
+            journal.record(journal.Op.CREATE_ANIMATION, animation.id, animation.name)
+            for frame in animation.frames:
+                journal.record(journal.Op.ADD_FRAME, animation.id, encode_frame(frame))
+        history.record(history.AnimationAdded(self, animation))
+
+        self.signals.notify("animationAdded", animation.id)
+
     def get_animation(self, animation_id: UUID) -> Optional[Animation]:
         return self.animations.get(animation_id)
 
     def update_animation(self, animation_id: UUID, name: str) -> bool:
         if animation := self.animations.get(animation_id):
+            history.record(
+                history.AnimationRenamed(self, animation_id, animation.name, name)
+            )
             animation.name = name
-            self.signals.animationModified.emit(animation_id)
+            journal.record(journal.Op.RENAME_ANIMATION, animation_id, name)
+            self.signals.notify("animationModified", animation_id)
             return True
         return False
 
     def delete_animation(self, animation_id: UUID) -> Optional[Animation]:
         if animation := self.animations.pop(animation_id, None):
-            self.signals.animationRemoved.emit(animation_id)
+            journal.record(journal.Op.DELETE_ANIMATION, animation_id)
+            if history.is_recording():
+                history.record(history.AnimationRemoved(self, animation))
+            self.signals.notify("animationRemoved", animation_id)
             return animation
         return None
 
-    def commit_all_changes(self):
-        for animation in self.list_animations():
-            animation.commit_frame_changes()
+    @contextmanager
+    def batch(self):
+        """Group edits into one transaction.
+
+        The model signals are emitted once, coalesced, when the outermost batch
+        closes, and the edits are undone as a single step.
+        """
+        with history.group(), observable.batch():
+            yield
+
+    def find_frame(self, frame_id: UUID) -> Optional[Frame]:
+        for animation in self.animations.values():
+            if frame := animation.get_frame(frame_id):
+                return frame
+        return None
+
+    def replay_journal(self, records: List[journal.Record]) -> int:
+        """Apply journaled edits on top of the last save, returns how many applied"""
+        Op = journal.Op
+        applied = 0
+
+        with journal.paused(), history.paused():
+            for op, values in records:
+                if op == Op.CREATE_ANIMATION:
+                    animation_id, name = values
+                    self.add_animation(Animation(id=animation_id, name=name))
+                    applied += 1
+                elif op == Op.DELETE_ANIMATION:
+                    applied += self.delete_animation(*values) is not None
+                elif op == Op.RENAME_ANIMATION:
+                    applied += self.update_animation(*values)
+                elif op == Op.ADD_IMAGE:
+                    self.sprite_bank.add(values[1])
+                    applied += 1
+                elif op in (
+                    Op.ADD_FRAME,
+                    Op.INSERT_FRAME,
+                    Op.REMOVE_FRAME,
+                    Op.UPDATE_FRAME,
+                ):
+                    animation_id, *args = values
+                    if animation := self.get_animation(animation_id):
+                        applied += self._replay_frame_op(animation, op, args)
+                elif frame := self.find_frame(values[0]):
+                    applied += self._replay_sprite_op(frame, op, values[1:])
+
+        return applied
+
+    @staticmethod
+    def _replay_frame_op(animation: Animation, op: journal.Op, args: List) -> bool:
+        if op == journal.Op.ADD_FRAME:
+            animation.add_frame(decode_frame(args[0]))
+            return True
+        if op == journal.Op.INSERT_FRAME:
+            row = min(args[0], len(animation.frames))
+            animation.insert_frame(row, decode_frame(args[1]))
+            return True
+        if op == journal.Op.REMOVE_FRAME:
+            return animation.remove_frame(args[0]) is not None
+        return animation.update_frame(args[0], **args[1])
+
+    @staticmethod
+    def _replay_sprite_op(frame: Frame, op: journal.Op, args: List) -> bool:
+        if op == journal.Op.ADD_SPRITE:
+            frame.add_sprite(Sprite(**args[0]))
+        elif op == journal.Op.REMOVE_SPRITE:
+            return frame.remove_sprite(args[0]) is not None
+        elif op == journal.Op.UPDATE_SPRITE:
+            return frame.update_sprite(args[0], **args[1])
+        elif op == journal.Op.MOVE_SPRITE:
+            if not all(frame.get_sprite(sprite_id) for sprite_id in args):
+                return False
+            frame.move_sprite(*args)
+        elif op == journal.Op.OFFSET_SPRITES:
+            frame.offset_sprites(*args)
+        return True
+
+    def commit_all_changes(self) -> Dict[UUID, Set[UUID]]:
+        """Save boundary, returns the modified frame ids of every animation"""
+        return {
+            animation.id: animation.commit_frame_changes()
+            for animation in self.list_animations()
+        }
 
     def list_animations(self) -> List[Animation]:
         return list(self.animations.values())
@@ -0,0 +1,270 @@
+from collections.abc import MutableSequence
+from typing import Dict, Iterable, List, Optional, Union
+from uuid import UUID
+
+import numpy as np
+
+from .sprite import Sprite
+
+# Placement fields stored as typed columns, names and ids are kept on the side
+COLUMNS: Dict[str, np.dtype] = {
+    "x": np.dtype(np.int32),
+    "y": np.dtype(np.int32),
+    "h_flip": np.dtype(np.bool_),
+    "v_flip": np.dtype(np.bool_),
+    "sprite_index": np.dtype(np.int32),
+    "z_index": np.dtype(np.int16),
+    "alpha": np.dtype(np.uint8),
+    "visible": np.dtype(np.bool_),
+}
+
+_ID_DTYPE = np.dtype("V16")
+
+
+def fit(name: str, value):
+    """Clamp a value into the range of its column, numpy raises on overflow"""
+    dtype = COLUMNS[name]
+    if dtype.kind in "iu":
+        info = np.iinfo(dtype)
+        return min(max(int(value), info.min), info.max)
+    return value
+
+
+class CompactSprites(MutableSequence):
+    """Struct of arrays storage for the sprites of a frame.
+
+    Behaves like a list of Sprite, but items are SpriteView objects created on
+    access that read and write the columns in place. Views follow their sprite
+    when the storage is reordered and fail once the sprite is removed. Values
+    out of range of a column are clamped, like a z index past 16 bits.
+    """
+
+    def __init__(self, sprites: Iterable[Sprite] = ()):
+        sprites = list(sprites)
+        capacity = max(len(sprites), 4)
+
+        self._columns = {
+            name: np.zeros(capacity, dtype) for name, dtype in COLUMNS.items()
+        }
+        self._ids = np.zeros(capacity, _ID_DTYPE)
+        self._names: List[str] = []
+        self._size = 0
+
+        # Bumped on every structural change so views know to look up their row
+        self._version = 0
+
+        # Row of each raw id, built on the first lookup after a structural change
+        self._rows: Optional[Dict[bytes, int]] = None
+
+        for sprite in sprites:
+            self.append(sprite)
+
+    @classmethod
+    def from_columns(
+        cls, ids: np.ndarray, names: List[str], columns: Dict[str, np.ndarray]
+    ) -> "CompactSprites":
+        """Adopt already decoded columns, as read from a project file"""
+        store = cls()
+        store._reserve(len(names))
+        store._ids[: len(names)] = ids
+        for name, column in store._columns.items():
+            column[: len(names)] = columns[name]
+        store._names = list(names)
+        store._size = len(names)
+        store._rows = None
+        return store
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        return SpriteView(self, self._check_index(index))
+
+    def __setitem__(self, index: int, sprite: Sprite):
+        self._write(self._check_index(index), sprite)
+        self._changed()
+
+    def __delitem__(self, index: int):
+        row = self._check_index(index)
+        last = self._size - 1
+
+        for column in self._all_columns():
+            column[row:last] = column[row + 1 : self._size]
+        del self._names[row]
+
+        self._size = last
+        self._changed()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (CompactSprites, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"CompactSprites({list(self)!r})"
+
+    def insert(self, index: int, sprite: Sprite):
+        # Same clamping as list.insert
+        row = min(max(index + self._size if index < 0 else index, 0), self._size)
+        self._reserve(self._size + 1)
+
+        for column in self._all_columns():
+            column[row + 1 : self._size + 1] = column[row : self._size]
+        self._names.insert(row, "")
+
+        self._size += 1
+        self._write(row, sprite)
+        self._changed()
+
+    def pop(self, index: int = -1) -> Sprite:
+        # Detach the sprite, a view would be dangling once the row is gone
+        row = self._check_index(index)
+        sprite = Sprite(**self._values(row))
+        del self[row]
+        return sprite
+
+    def column(self, name: str) -> np.ndarray:
+        """Live view of one placement column, writes go straight to the sprites"""
+        return self._columns[name][: self._size]
+
+    def ids(self) -> np.ndarray:
+        """Sprite ids as 16 byte raw UUIDs"""
+        return self._ids[: self._size]
+
+    def names(self) -> List[str]:
+        return self._names
+
+    def offset(self, dx: int, dy: int):
+        self.column("x")[:] += dx
+        self.column("y")[:] += dy
+
+    def sort_by_z(self):
+        """Higher z index first, equal z indices keep their order"""
+        order = np.argsort(-self.column("z_index").astype(np.int32), kind="stable")
+
+        for column in self._columns.values():
+            column[: self._size] = column[order]
+        self._ids[: self._size] = self._ids[order]
+        self._names = [self._names[i] for i in order.tolist()]
+
+        self._changed()
+
+    def swap(self, a: int, b: int):
+        a, b = self._check_index(a), self._check_index(b)
+        for column in self._all_columns():
+            column[[a, b]] = column[[b, a]]
+        self._names[a], self._names[b] = self._names[b], self._names[a]
+        self._version += 1
+
+        # Only two rows moved, patch the index instead of dropping it
+        if self._rows is not None:
+            ids = self._ids
+            self._rows[ids[a].tobytes()], self._rows[ids[b].tobytes()] = a, b
+
+    def row_of(self, sprite_id: UUID) -> Optional[int]:
+        if self._rows is None:
+            self._rows = {
+                raw.tobytes(): row for row, raw in enumerate(self._ids[: self._size])
+            }
+        return self._rows.get(sprite_id.bytes)
+
+    def to_sprites(self) -> List[Sprite]:
+        return [Sprite(**self._values(row)) for row in range(self._size)]
+
+    def _values(self, row: int) -> dict:
+        values = {name: column[row].item() for name, column in self._columns.items()}
+        values["id"] = UUID(bytes=self._ids[row].tobytes())
+        values["name"] = self._names[row]
+        return values
+
+    def _write(self, row: int, sprite: Sprite):
+        for name, column in self._columns.items():
+            column[row] = fit(name, getattr(sprite, name))
+        self._ids[row] = np.void(sprite.id.bytes)
+        self._names[row] = sprite.name
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("sprite index out of range")
+        return index
+
+    def _changed(self):
+        self._version += 1
+        self._rows = None
+
+    def _reserve(self, size: int):
+        capacity = len(self._ids)
+        if size <= capacity:
+            return
+
+        capacity = max(size, capacity * 2)
+        for name, column in self._columns.items():
+            self._columns[name] = np.resize(column, capacity)
+        self._ids = np.resize(self._ids, capacity)
+
+    def _all_columns(self) -> List[np.ndarray]:
+        return [*self._columns.values(), self._ids]
+
+
+class SpriteView(Sprite):
+    """Sprite whose fields live in a CompactSprites row"""
+
+    __slots__ = ("_store", "_row", "_version", "_id")
+
+    def __init__(self, store: CompactSprites, row: int):
+        # No dataclass init, every field is a property over the store
+        self._store = store
+        self._row = row
+        self._version = store._version
+        self._id = store._ids[row].tobytes()
+
+    def _resolve(self) -> int:
+        store = self._store
+        if self._version != store._version:
+            row = store.row_of(UUID(bytes=self._id))
+            if row is None:
+                raise LookupError("sprite is no longer in its frame")
+            self._row = row
+            self._version = store._version
+        return self._row
+
+    @property
+    def id(self) -> UUID:
+        return UUID(bytes=self._id)
+
+    @property
+    def name(self) -> str:
+        return self._store._names[self._resolve()]
+
+    @name.setter
+    def name(self, value: str):
+        self._store._names[self._resolve()] = value
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sprite):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{k}={v!r}" for k, v in self._store._values(self._resolve()).items()
+        )
+        return f"SpriteView({fields})"
+
+
+def _column_property(name: str) -> property:
+    def getter(self):
+        return self._store._columns[name][self._resolve()].item()
+
+    def setter(self, value):
+        self._store._columns[name][self._resolve()] = fit(name, value)
+
+    return property(getter, setter)
+
+
+for _name in COLUMNS:
+    setattr(SpriteView, _name, _column_property(_name))
@@ -1,7 +1,13 @@
-from dataclasses import dataclass, field
-from typing import Any, Dict, Iterator, List, Optional
+from bisect import bisect_right
+from dataclasses import asdict, dataclass, field
+from operator import neg
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from uuid import UUID
 
+import numpy as np
+
+from . import history, journal
+from .compact_sprites import CompactSprites
 from .iterator import CollectionIterator, I
 from .serializable import Serializable, T
 from .sprite import Sprite
@@ -13,45 +19,203 @@ class Frame(Serializable):
     ticks: int = 1
     sprites: List[Sprite] = field(default_factory=list)
     _modified: bool = field(default=False, init=False)
+    _revision: int = field(default=0, init=False, repr=False, compare=False)
+    _sprite_rows: Dict[UUID, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # Set while the frame belongs to an animation, see attach
+    _attached: bool = field(default=False, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Sprites are kept ordered by z from here on, see _z_row
+        if self._is_z_sorted():
+            self._reindex_sprites()
+        else:
+            self._sort_sprites()
 
     @classmethod
     def from_dict(cls: type[T], data: Dict[str, Any]) -> "Frame":
-        sprites_data = data.pop("sprites", [])
-        frame = super().from_dict(data)
-        frame.sprites = [Sprite.from_dict(s) for s in sprites_data]
-        return frame
+        data["sprites"] = [Sprite.from_dict(s) for s in data.get("sprites", [])]
+        return super().from_dict(data)
+
+    def _reindex_sprites(self, start: int = 0):
+        # Compact storage looks sprites up by itself
+        if self.is_compact:
+            return
+        for row in range(start, len(self.sprites)):
+            self._sprite_rows[self.sprites[row].id] = row
+
+    def _sort_sprites(self):
+        # Higher z index first
+        if self.is_compact:
+            self.sprites.sort_by_z()
+        else:
+            self.sprites.sort(key=lambda s: s.z_index, reverse=True)
+            self._reindex_sprites()
+
+    def _is_z_sorted(self) -> bool:
+        if self.is_compact:
+            return bool(np.all(np.diff(self.sprites.column("z_index")) <= 0))
+        return all(
+            a.z_index >= b.z_index for a, b in zip(self.sprites, self.sprites[1:])
+        )
+
+    def _z_row(self, z_index: int) -> int:
+        """Row for a new sprite, after the sprites with the same z or higher"""
+        if self.is_compact:
+            return bisect_right(self.sprites.column("z_index"), -z_index, key=neg)
+        return bisect_right(self.sprites, -z_index, key=lambda s: -s.z_index)
+
+    def _insert_sprite(self, sprite: Sprite):
+        row = self._z_row(sprite.z_index)
+        self.sprites.insert(row, sprite)
+        self._reindex_sprites(row)
+
+    def attach(self, attached: bool = True):
+        """Called by the animation the frame is added to or removed from.
+
+        Edits of a detached frame aren't journaled nor undoable on their own,
+        adding the frame to an animation records it whole.
+        """
+        self._attached = attached
 
     def add_sprite(self, sprite: Sprite) -> None:
-        self.sprites.append(sprite)
-        self.sprites.sort(key=lambda s: s.z_index, reverse=True)
-        self._modified = True
+        payload = journal.encode(self.id, asdict(sprite)) if self._attached else None
+        self._insert_sprite(sprite)
+        self._set_modified()
+
+        if self._attached:
+            journal.write(journal.Op.ADD_SPRITE, payload)
+            history.record(history.SpriteAdded(self, sprite))
+
+    def add_sprites(self, sprites: Iterable[Sprite]) -> None:
+        """Add many sprites at once, sorting them in a single pass"""
+        sprites = list(sprites)
+        payloads = [
+            journal.encode(self.id, asdict(sprite)) if self._attached else None
+            for sprite in sprites
+        ]
+        self.sprites.extend(sprites)
+        self._sort_sprites()
+        self._set_modified()
+        if not self._attached:
+            return
+
+        with history.group():
+            for sprite, payload in zip(sprites, payloads):
+                journal.write(journal.Op.ADD_SPRITE, payload)
+                history.record(history.SpriteAdded(self, sprite))
 
     def remove_sprite(self, sprite_id: UUID) -> Optional[Sprite]:
-        for i, sprite in enumerate(self.sprites):
-            if sprite.id == sprite_id:
-                self._modified = True
-                return self.sprites.pop(i)
-        return None
+        row = self.sprite_row(sprite_id)
+        if row is None:
+            return None
+
+        sprite = self.sprites.pop(row)
+        self._sprite_rows.pop(sprite_id, None)
+        self._reindex_sprites(row)
+
+        self._set_modified()
+        if self._attached:
+            journal.record(journal.Op.REMOVE_SPRITE, self.id, sprite_id)
+            history.record(history.SpriteRemoved(self, sprite))
+        return sprite
 
     def update_sprite(self, sprite_id: UUID, **kwargs) -> bool:
         if sprite := self.get_sprite(sprite_id):
+            kwargs = {
+                key: value for key, value in kwargs.items() if hasattr(sprite, key)
+            }
+            old = {key: getattr(sprite, key) for key in kwargs}
+            payload = (
+                journal.encode(self.id, sprite_id, kwargs) if self._attached else None
+            )
             if sprite.update(**kwargs):
-                self._modified = True
+                if kwargs.get("z_index", old.get("z_index")) != old.get("z_index"):
+                    self._reorder_sprite(sprite_id)
+                self._set_modified()
+                if self._attached:
+                    journal.write(journal.Op.UPDATE_SPRITE, payload)
+                    history.record(history.SpriteUpdated(self, sprite_id, old, kwargs))
                 return True
         return False
 
+    def _reorder_sprite(self, sprite_id: UUID):
+        # Take the sprite out and put it back where its new z belongs
+        row = self.sprite_row(sprite_id)
+        sprite = self.sprites.pop(row)
+        self._reindex_sprites(row)
+        self._insert_sprite(sprite)
+
     def move_sprite(self, from_id: UUID, to_id: UUID):
-        origin = self.get_sprite(from_id)
-        dst = self.get_sprite(to_id)
+        """Swap the z index of two sprites, and with it their rows"""
+        origin_row = self.sprite_row(from_id)
+        dst_row = self.sprite_row(to_id)
+        origin = self.sprites[origin_row]
+        dst = self.sprites[dst_row]
 
         origin.z_index, dst.z_index = dst.z_index, origin.z_index
 
-        # Higher z index first
-        self.sprites.sort(key=lambda s: s.z_index, reverse=True)
-        self._modified = True
+        # Rows in between keep a z between the two, so the order still holds
+        if self.is_compact:
+            self.sprites.swap(origin_row, dst_row)
+        else:
+            self.sprites[origin_row], self.sprites[dst_row] = dst, origin
+            self._sprite_rows[from_id], self._sprite_rows[to_id] = dst_row, origin_row
+        self._set_modified()
+        if self._attached:
+            journal.record(journal.Op.MOVE_SPRITE, self.id, from_id, to_id)
+            history.record(history.SpritesMoved(self, from_id, to_id))
+
+    def sprite_row(self, sprite_id: UUID) -> Optional[int]:
+        if self.is_compact:
+            return self.sprites.row_of(sprite_id)
+
+        row = self._sprite_rows.get(sprite_id)
+        if row is not None and row < len(self.sprites):
+            if self.sprites[row].id == sprite_id:
+                return row
+
+        # The sprites list was changed behind our back, rebuild the index
+        if len(self._sprite_rows) != len(self.sprites) or row is not None:
+            self._sprite_rows.clear()
+            self._reindex_sprites()
+            return self._sprite_rows.get(sprite_id)
+        return None
 
     def get_sprite(self, sprite_id: UUID) -> Optional[Sprite]:
-        return next((s for s in self.sprites if s.id == sprite_id), None)
+        row = self.sprite_row(sprite_id)
+        return self.sprites[row] if row is not None else None
+
+    def compact(self):
+        """Move the sprites to typed column storage, items become SpriteView"""
+        if not self.is_compact:
+            self.sprites = CompactSprites(self.sprites)
+            self._sprite_rows.clear()
+
+    @property
+    def is_compact(self) -> bool:
+        return isinstance(self.sprites, CompactSprites)
+
+    def offset_sprites(self, dx: int, dy: int):
+        if self.is_compact:
+            self.sprites.offset(dx, dy)
+        else:
+            for sprite in self.sprites:
+                sprite.x += dx
+                sprite.y += dy
+        self._set_modified()
+        if self._attached:
+            journal.record(journal.Op.OFFSET_SPRITES, self.id, dx, dy)
+            history.record(history.SpritesOffset(self, dx, dy))
+
+    def touch(self):
+        """Record a change made from outside, like the animation renaming it"""
+        self._revision += 1
+
+    def _set_modified(self):
+        self._modified = True
+        self.touch()
 
     def clear_modified_flag(self):
         self._modified = False
@@ -60,5 +224,10 @@ class Frame(Serializable):
     def is_modified(self) -> bool:
         return self._modified
 
+    @property
+    def revision(self) -> int:
+        """Bumped on every change, unlike the modified flag it's never reset"""
+        return self._revision
+
     def __iter__(self) -> Iterator[I]:
         return CollectionIterator(self.sprites)
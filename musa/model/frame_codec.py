@@ -0,0 +1,91 @@
+import struct
+from uuid import UUID
+
+import numpy as np
+
+from .compact_sprites import COLUMNS, CompactSprites, fit
+from .frame import Frame
+
+_FRAME = struct.Struct("<16siIH")  # frame id, ticks, sprite count, name size
+
+_SPRITE_RECORD = np.dtype(
+    [
+        ("id", "V16"),
+        ("x", "<i4"),
+        ("y", "<i4"),
+        ("sprite_index", "<i4"),
+        ("z_index", "<i2"),
+        ("alpha", "u1"),
+        ("flags", "u1"),
+    ]
+)
+_FLAGS = (("h_flip", 1), ("v_flip", 2), ("visible", 4))
+
+
+def encode_frame(frame: Frame) -> bytes:
+    """Frame chunk: fixed header, name, sprite records, name sizes, names"""
+    sprites = frame.sprites
+    if isinstance(sprites, CompactSprites):
+        ids, names = sprites.ids(), sprites.names()
+        columns = {name: sprites.column(name) for name in COLUMNS}
+    else:
+        ids = np.frombuffer(b"".join(s.id.bytes for s in sprites), "V16")
+        names = [s.name for s in sprites]
+        columns = {
+            name: np.array([fit(name, getattr(s, name)) for s in sprites], dtype)
+            for name, dtype in COLUMNS.items()
+        }
+
+    records = np.zeros(len(names), _SPRITE_RECORD)
+    records["id"] = ids
+    for name in ("x", "y", "sprite_index", "z_index", "alpha"):
+        records[name] = columns[name]
+    for name, bit in _FLAGS:
+        records["flags"] |= columns[name].astype(np.uint8) * bit
+
+    encoded = [name.encode() for name in names]
+    name = frame.name.encode()
+
+    return b"".join(
+        [
+            _FRAME.pack(frame.id.bytes, frame.ticks, len(names), len(name)),
+            name,
+            records.tobytes(),
+            np.array([len(n) for n in encoded], "<u2").tobytes(),
+            *encoded,
+        ]
+    )
+
+
+# Start of the frame header, enough to read the ticks
+_TICKS = struct.Struct("<16si")
+TICKS_SIZE = _TICKS.size
+
+
+def decode_ticks(chunk: bytes) -> int:
+    """Ticks of an encoded frame, only the start of its header is needed"""
+    return _TICKS.unpack_from(chunk)[1]
+
+
+def decode_frame(chunk: bytes) -> Frame:
+    frame_id, ticks, count, name_size = _FRAME.unpack_from(chunk)
+    pos = _FRAME.size
+    name = chunk[pos : pos + name_size].decode()
+    pos += name_size
+
+    records = np.frombuffer(chunk, _SPRITE_RECORD, count, pos)
+    pos += records.nbytes
+    sizes = np.frombuffer(chunk, "<u2", count, pos)
+    pos += sizes.nbytes
+
+    ends = (np.cumsum(sizes) + pos).tolist()
+    names = [chunk[start:end].decode() for start, end in zip([pos] + ends, ends)]
+
+    columns = {
+        name: records[name] for name in ("x", "y", "sprite_index", "z_index", "alpha")
+    }
+    for flag, bit in _FLAGS:
+        columns[flag] = records["flags"] & bit != 0
+
+    sprites = CompactSprites.from_columns(records["id"], names, columns)
+    return Frame(id=UUID(bytes=frame_id), name=name, ticks=ticks, sprites=sprites)
@@ -0,0 +1,354 @@
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from . import observable
+
+
+class Delta(ABC):
+    """Undoable change, holding only what it needs to go both ways"""
+
+    __slots__ = ()
+
+    # Rough bytes held by an entry, used against the history budget
+    COST = 64
+
+    @abstractmethod
+    def undo(self): ...
+
+    @abstractmethod
+    def redo(self): ...
+
+    def cost(self) -> int:
+        return self.COST
+
+    def merge(self, other: "Delta") -> bool:
+        """Absorb a newer delta into this one, returns whether it did"""
+        return False
+
+
+class SpriteUpdated(Delta):
+    __slots__ = ("frame", "sprite_id", "keys", "old", "new", "time")
+
+    # Edits of the same fields closer than this merge, like the steps of a drag
+    MERGE_INTERVAL = 0.5
+
+    def __init__(
+        self, frame, sprite_id: UUID, old: Dict[str, Any], new: Dict[str, Any]
+    ):
+        self.frame = frame
+        self.sprite_id = sprite_id
+        self.keys = tuple(new)
+        self.old = tuple(old[key] for key in self.keys)
+        self.new = tuple(new.values())
+        self.time = time.monotonic()
+
+    def undo(self):
+        self.frame.update_sprite(self.sprite_id, **dict(zip(self.keys, self.old)))
+
+    def redo(self):
+        self.frame.update_sprite(self.sprite_id, **dict(zip(self.keys, self.new)))
+
+    def cost(self) -> int:
+        return self.COST + 16 * len(self.keys)
+
+    def merge(self, other: Delta) -> bool:
+        if (
+            not isinstance(other, SpriteUpdated)
+            or other.frame is not self.frame
+            or other.sprite_id != self.sprite_id
+            or other.keys != self.keys
+            or other.time - self.time > self.MERGE_INTERVAL
+        ):
+            return False
+
+        self.new = other.new
+        self.time = other.time
+        return True
+
+
+class SpriteAdded(Delta):
+    __slots__ = ("frame", "sprite")
+
+    def __init__(self, frame, sprite):
+        self.frame = frame
+        self.sprite = sprite
+
+    def undo(self):
+        self.sprite = self.frame.remove_sprite(self.sprite.id)
+
+    def redo(self):
+        self.frame.add_sprite(self.sprite)
+
+
+class SpriteRemoved(SpriteAdded):
+    __slots__ = ()
+
+    undo, redo = SpriteAdded.redo, SpriteAdded.undo
+
+
+class SpritesMoved(Delta):
+    __slots__ = ("frame", "from_id", "to_id")
+
+    def __init__(self, frame, from_id: UUID, to_id: UUID):
+        self.frame = frame
+        self.from_id = from_id
+        self.to_id = to_id
+
+    def undo(self):
+        # A z swap is its own inverse
+        self.frame.move_sprite(self.from_id, self.to_id)
+
+    redo = undo
+
+
+class SpritesOffset(Delta):
+    __slots__ = ("frame", "dx", "dy")
+
+    def __init__(self, frame, dx: int, dy: int):
+        self.frame = frame
+        self.dx = dx
+        self.dy = dy
+
+    def undo(self):
+        self.frame.offset_sprites(-self.dx, -self.dy)
+
+    def redo(self):
+        self.frame.offset_sprites(self.dx, self.dy)
+
+
+class FrameAdded(Delta):
+    __slots__ = ("animation", "row", "frame")
+
+    def __init__(self, animation, row: int, frame):
+        self.animation = animation
+        self.row = row
+        self.frame = frame
+
+    def undo(self):
+        self.animation.remove_frame(self.frame.id)
+
+    def redo(self):
+        self.animation.insert_frame(self.row, self.frame)
+
+    def cost(self) -> int:
+        return self.COST + 64 * len(self.frame.sprites)
+
+
+class FrameRemoved(FrameAdded):
+    __slots__ = ()
+
+    undo, redo = FrameAdded.redo, FrameAdded.undo
+
+
+class FrameUpdated(Delta):
+    __slots__ = ("animation", "frame_id", "old", "new")
+
+    def __init__(self, animation, frame_id: UUID, old: Dict[str, Any], new):
+        self.animation = animation
+        self.frame_id = frame_id
+        self.old = old
+        self.new = new
+
+    def undo(self):
+        self.animation.update_frame(self.frame_id, **self.old)
+
+    def redo(self):
+        self.animation.update_frame(self.frame_id, **self.new)
+
+    def cost(self) -> int:
+        return self.COST + 32 * len(self.new)
+
+
+class AnimationAdded(Delta):
+    __slots__ = ("collection", "animation")
+
+    def __init__(self, collection, animation):
+        self.collection = collection
+        self.animation = animation
+
+    def undo(self):
+        self.collection.delete_animation(self.animation.id)
+
+    def redo(self):
+        self.collection.add_animation(self.animation)
+
+    def cost(self) -> int:
+        return self.COST + 256 * len(self.animation.frames)
+
+
+class AnimationRemoved(AnimationAdded):
+    __slots__ = ()
+
+    def __init__(self, collection, animation):
+        # Saves and compactions only keep the chunks of animations still in the
+        # collection, so lazy frames must be decoded while their file holds them
+        animation.frames = list(animation.frames)
+        super().__init__(collection, animation)
+
+    undo, redo = AnimationAdded.redo, AnimationAdded.undo
+
+
+class AnimationRenamed(Delta):
+    __slots__ = ("collection", "animation_id", "old", "new")
+
+    def __init__(self, collection, animation_id: UUID, old: str, new: str):
+        self.collection = collection
+        self.animation_id = animation_id
+        self.old = old
+        self.new = new
+
+    def undo(self):
+        self.collection.update_animation(self.animation_id, self.old)
+
+    def redo(self):
+        self.collection.update_animation(self.animation_id, self.new)
+
+
+class DeltaGroup(Delta):
+    """Several deltas undone and redone as one step"""
+
+    __slots__ = ("deltas",)
+
+    def __init__(self, deltas: List[Delta]):
+        self.deltas = deltas
+
+    def undo(self):
+        for delta in reversed(self.deltas):
+            delta.undo()
+
+    def redo(self):
+        for delta in self.deltas:
+            delta.redo()
+
+    def cost(self) -> int:
+        return sum(delta.cost() for delta in self.deltas)
+
+
+class History:
+    """Undo and redo stacks of model deltas, bounded by a memory budget.
+
+    The oldest entries are dropped once the estimated size of the undo stack
+    goes past the budget.
+    """
+
+    def __init__(self, budget: int = 1024 * 1024):
+        self.budget = budget
+        self.size = 0
+        self._undo: Deque[Tuple[Delta, int]] = deque()
+        self._redo: List[Delta] = []
+        self._group: Optional[List[Delta]] = None
+
+        # Emitted after an undo or redo, frames have no signals to tell the views
+        self.changed = observable.Signal()
+
+    def push(self, delta: Delta):
+        if self._group is not None:
+            self._group.append(delta)
+            return
+
+        self._redo.clear()
+        if self._undo and self._undo[-1][0].merge(delta):
+            return
+
+        cost = delta.cost()
+        self._undo.append((delta, cost))
+        self.size += cost
+        while self.size > self.budget and len(self._undo) > 1:
+            self.size -= self._undo.popleft()[1]
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> bool:
+        if not self._undo:
+            return False
+
+        delta, cost = self._undo.pop()
+        self.size -= cost
+        with paused(), observable.batch():
+            delta.undo()
+        self._redo.append(delta)
+        self.changed.emit()
+        return True
+
+    def redo(self) -> bool:
+        if not self._redo:
+            return False
+
+        delta = self._redo.pop()
+        with paused(), observable.batch():
+            delta.redo()
+
+        cost = delta.cost()
+        self._undo.append((delta, cost))
+        self.size += cost
+        self.changed.emit()
+        return True
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self.size = 0
+
+    @contextmanager
+    def group(self):
+        """Record every delta pushed inside as a single undo step"""
+        if self._group is not None:
+            yield
+            return
+
+        self._group = []
+        try:
+            yield
+        finally:
+            deltas, self._group = self._group, None
+            if len(deltas) == 1:
+                self.push(deltas[0])
+            elif deltas:
+                self.push(DeltaGroup(deltas))
+
+
+# History the model edits are recorded to, if any
+active: Optional[History] = None
+_paused = False
+
+
+def activate(history: Optional[History]):
+    global active
+    active = history
+
+
+def is_recording() -> bool:
+    return active is not None and not _paused
+
+
+def record(delta: Delta):
+    if is_recording():
+        active.push(delta)
+
+
+@contextmanager
+def group():
+    if active is None:
+        yield
+    else:
+        with active.group():
+            yield
+
+
+@contextmanager
+def paused():
+    """Apply edits without recording them, like when undoing"""
+    global _paused
+    previous, _paused = _paused, True
+    try:
+        yield
+    finally:
+        _paused = previous
@@ -0,0 +1,224 @@
+import os
+import struct
+import zlib
+from contextlib import contextmanager
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from uuid import UUID
+
+# payload size, crc32 of op and payload, op
+_RECORD = struct.Struct("<IIB")
+_SIZE = struct.Struct("<H")
+_BLOB_SIZE = struct.Struct("<I")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+
+
+class Op(IntEnum):
+    CREATE_ANIMATION = 1  # animation id, name
+    DELETE_ANIMATION = 2  # animation id
+    RENAME_ANIMATION = 3  # animation id, name
+    ADD_FRAME = 4  # animation id, frame chunk
+    REMOVE_FRAME = 5  # animation id, frame id
+    UPDATE_FRAME = 6  # animation id, frame id, fields
+    ADD_SPRITE = 7  # frame id, sprite fields
+    REMOVE_SPRITE = 8  # frame id, sprite id
+    UPDATE_SPRITE = 9  # frame id, sprite id, fields
+    MOVE_SPRITE = 10  # frame id, from sprite id, to sprite id
+    OFFSET_SPRITES = 11  # frame id, dx, dy
+    INSERT_FRAME = 12  # animation id, row, frame chunk
+    ADD_IMAGE = 13  # sprite index, encoded image
+
+
+Record = Tuple[Op, List[Any]]
+
+
+class Journal:
+    """Append only log of the model edits made since the last save.
+
+    Records are buffered in memory and written in batches, either when the
+    buffer is full or when the owner calls flush on a timer. A record cut short
+    by a crash is detected by its checksum and ends the replay.
+    """
+
+    FLUSH_SIZE = 64 * 1024
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._buffer = bytearray()
+
+        # Records left by a session that never saved, cut at the first torn one
+        self.recovered: List[Record] = []
+        size = 0
+        if self.path.exists():
+            self.recovered, size = self.read(self.path)
+
+        self._file = open(self.path, "ab")
+        self._file.truncate(size)
+
+    def append(self, op: Op, payload: bytes):
+        body = bytes([op]) + payload
+        self._buffer += _RECORD.pack(len(payload), zlib.crc32(body), op)
+        self._buffer += payload
+
+        if len(self._buffer) >= self.FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        self._file.write(self._buffer)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer.clear()
+
+    def truncate(self):
+        """Drop every record, the project file now holds all of them"""
+        self._buffer.clear()
+        self._file.truncate(0)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    @staticmethod
+    def read(path: Union[str, Path]) -> Tuple[List[Record], int]:
+        """Valid records of a journal file, and the size they take"""
+        with open(path, "rb") as file:
+            data = file.read()
+
+        records = []
+        pos = 0
+        while pos + _RECORD.size <= len(data):
+            size, crc, op = _RECORD.unpack_from(data, pos)
+            payload = data[pos + _RECORD.size : pos + _RECORD.size + size]
+            if len(payload) != size or zlib.crc32(bytes([op]) + payload) != crc:
+                break
+
+            records.append((Op(op), list(_decode_values(payload))))
+            pos += _RECORD.size + size
+
+        return records, pos
+
+
+# Journal the model edits are recorded to, if any
+active: Optional[Journal] = None
+_paused = False
+
+
+def activate(journal: Optional[Journal]):
+    global active
+    active = journal
+
+
+def is_recording() -> bool:
+    return active is not None and not _paused
+
+
+def record(op: Op, *values):
+    write(op, encode(*values))
+
+
+def encode(*values) -> Optional[bytes]:
+    """Payload of a record, None when not recording.
+
+    Mutators taking arbitrary fields encode them before applying the edit, so a
+    value that can't be journaled raises TypeError with the model untouched.
+    """
+    if is_recording():
+        return b"".join(_encode_value(value) for value in values)
+    return None
+
+
+def write(op: Op, payload: Optional[bytes]):
+    """Append a payload from encode, once the edit is applied"""
+    if payload is not None and is_recording():
+        active.append(op, payload)
+
+
+@contextmanager
+def paused():
+    """Apply edits without recording them, like when replaying the journal"""
+    global _paused
+    previous, _paused = _paused, True
+    try:
+        yield
+    finally:
+        _paused = previous
+
+
+def _encode_value(value: Any) -> bytes:
+    # bool before int, it's a subclass
+    if isinstance(value, UUID):
+        return b"u" + value.bytes
+    if isinstance(value, bool):
+        return b"b" + bytes([value])
+    if isinstance(value, int):
+        return b"i" + _INT.pack(value)
+    if isinstance(value, float):
+        return b"f" + _FLOAT.pack(value)
+    if value is None:
+        return b"n"
+    if isinstance(value, str):
+        encoded = value.encode()
+        return b"s" + _SIZE.pack(len(encoded)) + encoded
+    if isinstance(value, bytes):
+        return b"y" + _BLOB_SIZE.pack(len(value)) + value
+    if isinstance(value, (list, tuple)):
+        items = [_encode_value(v) for v in value]
+        return b"l" + _SIZE.pack(len(items)) + b"".join(items)
+    if isinstance(value, dict):
+        items = [_encode_value(key) + _encode_value(v) for key, v in value.items()]
+        return b"d" + _SIZE.pack(len(items)) + b"".join(items)
+    raise TypeError(f"Can't journal {type(value).__name__}")
+
+
+def _decode_values(payload: bytes) -> Iterator[Any]:
+    pos = 0
+    while pos < len(payload):
+        value, pos = _decode_value(payload, pos)
+        yield value
+
+
+def _decode_value(data: bytes, pos: int) -> Tuple[Any, int]:
+    tag = data[pos : pos + 1]
+    pos += 1
+
+    if tag == b"u":
+        return UUID(bytes=data[pos : pos + 16]), pos + 16
+    if tag == b"b":
+        return bool(data[pos]), pos + 1
+    if tag == b"i":
+        return _INT.unpack_from(data, pos)[0], pos + _INT.size
+    if tag == b"f":
+        return _FLOAT.unpack_from(data, pos)[0], pos + _FLOAT.size
+    if tag == b"n":
+        return None, pos
+    if tag == b"s":
+        (size,) = _SIZE.unpack_from(data, pos)
+        pos += _SIZE.size
+        return data[pos : pos + size].decode(), pos + size
+    if tag == b"y":
+        (size,) = _BLOB_SIZE.unpack_from(data, pos)
+        pos += _BLOB_SIZE.size
+        return data[pos : pos + size], pos + size
+    if tag == b"l":
+        (count,) = _SIZE.unpack_from(data, pos)
+        pos += _SIZE.size
+        values = []
+        for _ in range(count):
+            value, pos = _decode_value(data, pos)
+            values.append(value)
+        return values, pos
+    if tag == b"d":
+        (count,) = _SIZE.unpack_from(data, pos)
+        pos += _SIZE.size
+        items: Dict[Any, Any] = {}
+        for _ in range(count):
+            key, pos = _decode_value(data, pos)
+            items[key], pos = _decode_value(data, pos)
+        return items, pos
+    raise ValueError(f"Unknown journal value tag {tag!r}")
@@ -0,0 +1,136 @@
+from abc import ABC, abstractmethod
+from collections.abc import MutableSequence
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from uuid import UUID
+
+from .frame import Frame
+
+Location = Tuple[int, int]  # offset, size
+
+
+class FrameSource(ABC):
+    """Where the encoded frames of a LazyFrameList live"""
+
+    @abstractmethod
+    def read(self, offset: int, size: int) -> bytes: ...
+
+
+class LazyFrameList(MutableSequence):
+    """List of frames decoded from their file chunk on first access.
+
+    Frame ids are known up front, so the owning animation can index them without
+    decoding anything. Frames that were never accessed can't have been modified
+    and are written back from their raw chunk.
+    """
+
+    def __init__(
+        self,
+        source: FrameSource,
+        ids: List[UUID],
+        locations: List[Location],
+        decode: Callable[[bytes], Frame],
+    ):
+        self._source = source
+        self._decode = decode
+        self._ids = ids
+        self._locations: List[Optional[Location]] = locations
+        self._frames: List[Optional[Frame]] = [None] * len(ids)
+
+        # Revision of each loaded frame when it last matched its chunk
+        self._revisions: List[Optional[int]] = [None] * len(ids)
+
+    @classmethod
+    def from_frames(
+        cls,
+        source: FrameSource,
+        frames: List[Frame],
+        locations: List[Location],
+        decode: Callable[[bytes], Frame],
+    ) -> "LazyFrameList":
+        """Wrap frames that are already loaded and were just written to source"""
+        lazy = cls(source, [frame.id for frame in frames], list(locations), decode)
+        lazy._frames = list(frames)
+        lazy._revisions = [frame.revision for frame in frames]
+        return lazy
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        frame = self._frames[index]
+        if frame is None:
+            # Only animations hold lazy frames
+            frame = self._decode(self.raw_chunk(index))
+            frame.attach()
+            self._frames[index] = frame
+            self._revisions[index] = frame.revision
+        return frame
+
+    def __setitem__(self, index: int, frame: Frame):
+        self._ids[index] = frame.id
+        self._frames[index] = frame
+        self._locations[index] = None
+        self._revisions[index] = None
+
+    def __delitem__(self, index: int):
+        del self._ids[index]
+        del self._frames[index]
+        del self._locations[index]
+        del self._revisions[index]
+
+    def insert(self, index: int, frame: Frame):
+        self._ids.insert(index, frame.id)
+        self._frames.insert(index, frame)
+        self._locations.insert(index, None)
+        self._revisions.insert(index, None)
+
+    def frame_ids(self) -> List[UUID]:
+        return self._ids
+
+    def is_loaded(self, index: int) -> bool:
+        return self._frames[index] is not None
+
+    def loaded_frames(self) -> Iterator[Frame]:
+        return (frame for frame in self._frames if frame is not None)
+
+    def location(self, index: int) -> Optional[Location]:
+        """Chunk of the frame in the source, None for frames added since"""
+        return self._locations[index]
+
+    def clean_location(self, index: int) -> Optional[Location]:
+        """Chunk of the frame if it still holds the frame as it is now"""
+        frame = self._frames[index]
+        if frame is not None and frame.revision != self._revisions[index]:
+            return None
+        return self._locations[index]
+
+    def raw_chunk(self, index: int) -> bytes:
+        offset, size = self._locations[index]
+        return self._source.read(offset, size)
+
+    def peek(self, index: int, size: int) -> bytes:
+        """Start of the frame chunk, for fields readable without decoding"""
+        offset, chunk_size = self._locations[index]
+        return self._source.read(offset, min(size, chunk_size))
+
+    @property
+    def source(self) -> FrameSource:
+        return self._source
+
+    def rebind(self, source: FrameSource, locations: List[Location]):
+        """Point the frames at their chunks in a newly written file"""
+        self._source = source
+        self._locations = list(locations)
+        self._revisions = [
+            frame.revision if frame is not None else None for frame in self._frames
+        ]
+
+    def relocate(self, relocations: Dict[int, Location]):
+        """Follow the chunks after the source was compacted, by their old offset"""
+        self._locations = [
+            relocations[location[0]] if location else None
+            for location in self._locations
+        ]
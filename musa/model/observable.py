@@ -1,17 +1,130 @@
-from uuid import UUID
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from weakref import WeakMethod
 
-from PyQt5.QtCore import QObject, pyqtSignal
+Emission = Tuple["ModelSignals", str, Tuple[Any, ...]]
 
+# Emissions held back by the open batch, in order
+_pending: Optional[List[Emission]] = None
 
-class AnimationSignals(QObject):
-    frameAdded = pyqtSignal(UUID)  # animation id
-    frameRemoved = pyqtSignal(UUID, UUID)  # animation id, frame id
-    frameModified = pyqtSignal(UUID, UUID)  # animation id, frame id
-    animationModified = pyqtSignal(UUID)  # animation id
+# Signals saying something changed in place, the rest carry positions and are
+# always sent as they came
+_COALESCED = {"frameModified", "animationModified"}
 
 
-class CollectionSignals(QObject):
-    animationAdded = pyqtSignal(UUID)  # animation id
-    animationRemoved = pyqtSignal(UUID)  # animation id
-    animationModified = pyqtSignal(UUID)  # animation id
-    collectionLoaded = pyqtSignal()  # entire collection has been loaded
+class Signal:
+    """Plain Python signal, slots are called right away on the emitting thread.
+
+    Bound methods are held weakly so a model never keeps its views alive, any
+    other callable is held until disconnected.
+    """
+
+    __slots__ = ("_slots",)
+
+    def __init__(self):
+        self._slots: List[Union[WeakMethod, Callable]] = []
+
+    def connect(self, slot: Callable):
+        try:
+            self._slots.append(WeakMethod(slot))
+        except TypeError:
+            self._slots.append(slot)
+
+    def disconnect(self, slot: Callable):
+        for i, ref in enumerate(self._slots):
+            if (ref() if isinstance(ref, WeakMethod) else ref) == slot:
+                del self._slots[i]
+                return
+        raise TypeError(f"{slot!r} is not connected")
+
+    def emit(self, *args):
+        dead = False
+        for ref in tuple(self._slots):
+            slot = ref() if isinstance(ref, WeakMethod) else ref
+            if slot is None:
+                dead = True
+            else:
+                slot(*args)
+
+        if dead:
+            self._slots = [
+                ref
+                for ref in self._slots
+                if not isinstance(ref, WeakMethod) or ref() is not None
+            ]
+
+
+class ModelSignals:
+    __slots__ = ()
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, Signal())
+
+    def __reduce__(self):
+        # Connections belong to this process, a copy starts without any
+        return type(self), ()
+
+    def notify(self, name: str, *args):
+        """Emit a signal by name, or queue it while a batch is open"""
+        if _pending is None:
+            getattr(self, name).emit(*args)
+        else:
+            _pending.append((self, name, args))
+
+
+class AnimationSignals(ModelSignals):
+    __slots__ = (
+        "frameAdded",  # animation id, frame id, row
+        "frameRemoved",  # animation id, frame id, row
+        "frameModified",  # animation id, frame id
+        "animationModified",  # animation id, as a whole
+    )
+
+
+class CollectionSignals(ModelSignals):
+    __slots__ = (
+        "animationAdded",  # animation id
+        "animationRemoved",  # animation id
+        "animationModified",  # animation id
+        "collectionLoaded",  # entire collection has been loaded
+    )
+
+
+@contextmanager
+def batch():
+    """Hold back model signals and emit them coalesced when the batch closes.
+
+    Repeated in place changes are sent once, and an animation with several
+    modified frames is reported as modified as a whole instead.
+    """
+    global _pending
+    if _pending is not None:
+        yield
+        return
+
+    _pending = []
+    try:
+        yield
+    finally:
+        pending, _pending = _pending, None
+        _emit(pending)
+
+
+def _emit(pending: List[Emission]):
+    modified: Dict[Tuple[ModelSignals, Any], int] = {}
+    for signals, name, args in pending:
+        if name == "frameModified":
+            key = (signals, args[0])
+            modified[key] = modified.get(key, 0) + 1
+
+    sent = set()
+    for signals, name, args in pending:
+        if name == "frameModified" and modified[signals, args[0]] > 1:
+            name, args = "animationModified", args[:1]
+
+        if name in _COALESCED:
+            if (signals, name, args) in sent:
+                continue
+            sent.add((signals, name, args))
+        getattr(signals, name).emit(*args)
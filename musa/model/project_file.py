@@ -0,0 +1,424 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple, Union
+from uuid import UUID
+from weakref import WeakSet
+
+import numpy as np
+
+from .animation import Animation
+from .frame_codec import decode_frame, encode_frame
+from .lazy_frames import FrameSource, LazyFrameList, Location
+
+MAGIC = b"MUSA"
+VERSION = 2
+
+_HEADER = struct.Struct("<4sHHQQ")  # magic, version, reserved, index offset, size
+_ANIMATION = struct.Struct("<16sIH")  # animation id, frame count, name size
+_COUNT = struct.Struct("<I")
+
+_FRAME_ENTRY = np.dtype([("id", "V16"), ("offset", "<u8"), ("size", "<u4")])
+_IMAGE_ENTRY = np.dtype([("offset", "<u8"), ("size", "<u4")])
+
+IndexRecord = Tuple[bytes, str, np.ndarray]  # animation id, name, frame entries
+Relocations = Dict[int, Location]  # old chunk offset, new location
+
+
+def pack_project(
+    animations: List[Tuple[bytes, str, List[Tuple[bytes, bytes]]]],
+    images: List[bytes] = (),
+) -> bytes:
+    """Whole project file from encoded frames, as (id, name, [(id, chunk)]), and
+    the encoded images of the sprite bank"""
+    chunks = []
+    records = []
+    offset = _HEADER.size
+    for animation_id, name, frames in animations:
+        locations = []
+        for _, chunk in frames:
+            locations.append((offset, len(chunk)))
+            chunks.append(chunk)
+            offset += len(chunk)
+
+        frame_ids = np.frombuffer(b"".join(frame_id for frame_id, _ in frames), "V16")
+        records.append((animation_id, name, frame_ids, locations))
+
+    image_locations = []
+    for image in images:
+        image_locations.append((offset, len(image)))
+        chunks.append(image)
+        offset += len(image)
+
+    index = _encode_index(records, image_locations)
+    return b"".join(
+        [_HEADER.pack(MAGIC, VERSION, 0, offset, len(index)), *chunks, index]
+    )
+
+
+class ProjectFile(FrameSource):
+    """Chunked binary project file, opened through a read only memory map.
+
+    The file starts with a fixed header pointing at the index, which lists the
+    animations and the offset of each of their frame chunks, then the chunks of
+    the sprite bank images. Opening a project only reads the index, frames are
+    decoded when first accessed.
+
+    Saving appends the modified frames, the images added to the bank and a new
+    index, then points the header at it, so older chunks become garbage until
+    the file is compacted.
+    """
+
+    # Compact once garbage is past this size and this share of the file
+    COMPACT_MIN_GARBAGE = 4 * 1024 * 1024
+    COMPACT_RATIO = 0.5
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.index_offset, self.index_size = _read_header(self._map)
+        except ValueError:
+            self.close()
+            raise
+
+        index, self.image_locations = _parse_index(
+            self.read(self.index_offset, self.index_size)
+        )
+        self.live_size = _live_size(index, self.image_locations, self.index_size)
+
+        # Bumped on every save, a compaction of an older state is stale
+        self.generation = 0
+        self._bound: "WeakSet[LazyFrameList]" = WeakSet()
+
+    def read(self, offset: int, size: int) -> bytes:
+        return self._map[offset : offset + size]
+
+    def read_animations(self) -> List[Animation]:
+        animations = []
+        index, _ = _parse_index(self.read(self.index_offset, self.index_size))
+        for animation_id, name, entries in index:
+            frames = LazyFrameList(
+                self,
+                [UUID(bytes=frame_id) for frame_id in entries["id"].tolist()],
+                list(zip(entries["offset"].tolist(), entries["size"].tolist())),
+                decode_frame,
+            )
+            animations.append(
+                Animation(id=UUID(bytes=animation_id), name=name, frames=frames)
+            )
+
+        return animations
+
+    def read_images(self) -> List[bytes]:
+        """Encoded images of the sprite bank, by sprite index"""
+        return [self.read(offset, size) for offset, size in self.image_locations]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._map.closed
+
+    @property
+    def garbage(self) -> int:
+        return len(self._map) - self.live_size
+
+    def needs_compaction(self) -> bool:
+        return (
+            self.garbage > self.COMPACT_MIN_GARBAGE
+            and self.garbage > len(self._map) * self.COMPACT_RATIO
+        )
+
+    @classmethod
+    def write(
+        cls,
+        path: Union[str, Path],
+        animations: List[Animation],
+        images: List[bytes] = (),
+    ) -> "ProjectFile":
+        """Write the animations and images to path and return the file opened again.
+
+        Frames that were never decoded are copied from their old chunk, and the
+        frames of every animation are moved over to the new file.
+        """
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        with open(tmp_path, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+            layout = [_write_frames(file, animation) for animation in animations]
+            image_locations = _write_images(file, images)
+            cls._write_index(file, _index_records(animations, layout), image_locations)
+
+        # Release the old maps before replacing what may be the same file
+        sources: Set[FrameSource] = set()
+        for animation in animations:
+            if isinstance(animation.frames, LazyFrameList):
+                sources.add(animation.frames.source)
+        for source in sources:
+            if isinstance(source, ProjectFile):
+                source.close()
+
+        os.replace(tmp_path, path)
+        project = cls(path)
+
+        for animation, locations in zip(animations, layout):
+            project._bind(animation, locations)
+
+        return project
+
+    def save(
+        self,
+        animations: List[Animation],
+        dirty: Dict[UUID, Set[UUID]],
+        images: List[bytes] = (),
+    ):
+        """Append the frames that changed since the last save and a new index.
+
+        `dirty` maps animation ids to the ids of their modified frames, as
+        returned by AnimationCollection.commit_all_changes. Images are only
+        ever added to the bank, the ones past those already saved are appended.
+        """
+        with open(self.path, "r+b") as file:
+            file.seek(0, os.SEEK_END)
+            layout = [
+                _write_frames(file, animation, self, dirty.get(animation.id, set()))
+                for animation in animations
+            ]
+            self.image_locations += _write_images(
+                file, images[len(self.image_locations) :]
+            )
+            self.index_offset, self.index_size = self._write_index(
+                file, _index_records(animations, layout), self.image_locations
+            )
+
+        self.live_size = _HEADER.size + self.index_size
+        self.live_size += sum(size for locations in layout for _, size in locations)
+        self.live_size += sum(size for _, size in self.image_locations)
+        self.generation += 1
+        self._remap()
+
+        for animation, locations in zip(animations, layout):
+            self._bind(animation, locations)
+
+    @staticmethod
+    def compact(path: Union[str, Path], tmp_path: Union[str, Path]) -> Relocations:
+        """Copy the live chunks of the file at path into a new file at tmp_path.
+
+        Only reads the file, so it's safe to run off the GUI thread. Returns the
+        new location of every chunk by its old offset.
+        """
+        relocations: Relocations = {}
+        with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+            index_offset, index_size = _read_header(src.read(_HEADER.size))
+            src.seek(index_offset)
+            index, image_locations = _parse_index(src.read(index_size))
+
+            dst.write(_HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+
+            def copy(offset: int, size: int) -> Location:
+                if offset not in relocations:
+                    src.seek(offset)
+                    relocations[offset] = (dst.tell(), size)
+                    dst.write(src.read(size))
+                return relocations[offset]
+
+            records = []
+            for animation_id, name, entries in index:
+                locations = [
+                    copy(offset, size)
+                    for offset, size in zip(
+                        entries["offset"].tolist(), entries["size"].tolist()
+                    )
+                ]
+                records.append((animation_id, name, entries["id"], locations))
+
+            image_locations = [copy(offset, size) for offset, size in image_locations]
+            ProjectFile._write_index(dst, records, image_locations)
+
+        return relocations
+
+    def finish_compaction(
+        self, generation: int, tmp_path: Union[str, Path], relocations: Relocations
+    ) -> bool:
+        """Swap in a compacted copy, unless the file was saved again meanwhile"""
+        if self.closed or generation != self.generation:
+            os.remove(tmp_path)
+            return False
+
+        self._map.close()
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index_offset, self.index_size = _read_header(self._map)
+        self.live_size = len(self._map)
+        self.image_locations = [
+            relocations[offset] for offset, _ in self.image_locations
+        ]
+
+        for frames in list(self._bound):
+            frames.relocate(relocations)
+        return True
+
+    def _remap(self):
+        self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _bind(self, animation: Animation, locations: List[Location]):
+        if isinstance(animation.frames, LazyFrameList):
+            animation.frames.rebind(self, locations)
+        else:
+            animation.frames = LazyFrameList.from_frames(
+                self, animation.frames, locations, decode_frame
+            )
+        self._bound.add(animation.frames)
+
+    @staticmethod
+    def _write_index(
+        file: BinaryIO,
+        records: List[Tuple[bytes, str, np.ndarray, List[Location]]],
+        image_locations: List[Location],
+    ) -> Location:
+        # Everything the header will point at must be on disk before it does
+        index_offset = file.tell()
+        index = _encode_index(records, image_locations)
+        file.write(index)
+        file.flush()
+        os.fsync(file.fileno())
+
+        file.seek(0)
+        file.write(_HEADER.pack(MAGIC, VERSION, 0, index_offset, len(index)))
+        file.flush()
+        os.fsync(file.fileno())
+
+        return index_offset, len(index)
+
+
+def _write_frames(
+    file: BinaryIO,
+    animation: Animation,
+    source: Optional[FrameSource] = None,
+    dirty: Set[UUID] = frozenset(),
+) -> List[Location]:
+    # Chunks already in source are kept unless their frame is dirty
+    frames = animation.frames
+    lazy = isinstance(frames, LazyFrameList)
+    bound = lazy and source is not None and frames.source is source
+
+    locations = []
+    for row in range(len(frames)):
+        location = frames.clean_location(row) if bound else None
+        if location is not None and frames.frame_ids()[row] in dirty:
+            location = None
+
+        if location is None:
+            if lazy and not frames.is_loaded(row):
+                chunk = frames.raw_chunk(row)
+            else:
+                chunk = encode_frame(frames[row])
+            location = (file.tell(), len(chunk))
+            file.write(chunk)
+
+        locations.append(location)
+
+    return locations
+
+
+def _write_images(file: BinaryIO, images: List[bytes]) -> List[Location]:
+    locations = []
+    for image in images:
+        locations.append((file.tell(), len(image)))
+        file.write(image)
+    return locations
+
+
+def _read_header(data) -> Location:
+    magic, version, _, index_offset, index_size = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a M.U.S.E project")
+    if version > VERSION:
+        raise ValueError(f"needs a newer M.U.S.E (format {version})")
+    return index_offset, index_size
+
+
+def _parse_index(index: bytes) -> Tuple[List[IndexRecord], List[Location]]:
+    (count,) = _COUNT.unpack_from(index)
+    pos = _COUNT.size
+
+    records = []
+    for _ in range(count):
+        animation_id, frame_count, name_size = _ANIMATION.unpack_from(index, pos)
+        pos += _ANIMATION.size
+        name = index[pos : pos + name_size].decode()
+        pos += name_size
+
+        entries = np.frombuffer(index, _FRAME_ENTRY, frame_count, pos)
+        pos += entries.nbytes
+        records.append((animation_id, name, entries))
+
+    # Files from before the sprite bank end with the animations
+    images = []
+    if pos < len(index):
+        (count,) = _COUNT.unpack_from(index, pos)
+        entries = np.frombuffer(index, _IMAGE_ENTRY, count, pos + _COUNT.size)
+        images = list(zip(entries["offset"].tolist(), entries["size"].tolist()))
+
+    return records, images
+
+
+def _encode_index(
+    records: List[Tuple[bytes, str, np.ndarray, List[Location]]],
+    image_locations: List[Location],
+) -> bytes:
+    parts = [_COUNT.pack(len(records))]
+    for animation_id, name, frame_ids, locations in records:
+        entries = np.zeros(len(locations), _FRAME_ENTRY)
+        entries["id"] = frame_ids
+        entries["offset"] = [offset for offset, _ in locations]
+        entries["size"] = [size for _, size in locations]
+
+        name = name.encode()
+        parts += [
+            _ANIMATION.pack(animation_id, len(locations), len(name)),
+            name,
+            entries.tobytes(),
+        ]
+
+    images = np.zeros(len(image_locations), _IMAGE_ENTRY)
+    images["offset"] = [offset for offset, _ in image_locations]
+    images["size"] = [size for _, size in image_locations]
+    parts += [_COUNT.pack(len(image_locations)), images.tobytes()]
+
+    return b"".join(parts)
+
+
+def _index_records(
+    animations: List[Animation], layout: List[List[Location]]
+) -> List[Tuple[bytes, str, np.ndarray, List[Location]]]:
+    records = []
+    for animation, locations in zip(animations, layout):
+        if isinstance(animation.frames, LazyFrameList):
+            ids = animation.frames.frame_ids()
+        else:
+            ids = [frame.id for frame in animation.frames]
+
+        frame_ids = np.frombuffer(b"".join(i.bytes for i in ids), "V16")
+        records.append((animation.id.bytes, animation.name, frame_ids, locations))
+
+    return records
+
+
+def _live_size(
+    index: List[IndexRecord], image_locations: List[Location], index_size: int
+) -> int:
+    chunks = dict(image_locations)
+    for _, _, entries in index:
+        chunks.update(zip(entries["offset"].tolist(), entries["size"].tolist()))
+    return _HEADER.size + index_size + sum(chunks.values())
@@ -1,4 +1,5 @@
-from dataclasses import dataclass, field
+from collections.abc import MutableSequence
+from dataclasses import dataclass, field, fields
 from typing import Any, Dict, Type, TypeVar
 from uuid import UUID, uuid4
 
@@ -18,10 +19,14 @@ class Serializable:
 
     def to_dict(self) -> Dict[str, Any]:
         result = {}
-        for key, value in self.__dict__.items():
+        # Only constructor fields, runtime state like signals and indexes is rebuilt
+        for f in fields(self):
+            if not f.init:
+                continue
+            key, value = f.name, getattr(self, f.name)
             if isinstance(value, UUID):
                 result[key] = str(value)
-            elif isinstance(value, list):
+            elif isinstance(value, (list, MutableSequence)):
                 result[key] = [
                     item.to_dict() if isinstance(item, Serializable) else item
                     for item in value
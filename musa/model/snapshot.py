@@ -0,0 +1,92 @@
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Tuple
+from uuid import UUID
+
+from .animation import Animation
+from .frame import Frame
+from .frame_codec import decode_frame, encode_frame
+from .lazy_frames import LazyFrameList
+
+
+class FrameSnapshot(NamedTuple):
+    id: UUID
+    version: Hashable  # frame revision, or its chunk location while unchanged
+    chunk: bytes
+
+    def thaw(self) -> Frame:
+        return decode_frame(self.chunk)
+
+
+class AnimationSnapshot(NamedTuple):
+    id: UUID
+    name: str
+    frames: Tuple[FrameSnapshot, ...]
+
+    def thaw(self) -> Animation:
+        return Animation(
+            id=self.id, name=self.name, frames=[frame.thaw() for frame in self.frames]
+        )
+
+
+# Immutable and picklable, frames are kept in their encoded form
+CollectionSnapshot = Tuple[AnimationSnapshot, ...]
+
+
+class Snapshotter:
+    """Take snapshots of animations, reusing the frames that didn't change.
+
+    Frames are encoded again only when their revision changed since the last
+    snapshot, and frames that still match their chunk in the project file are
+    copied from it without being decoded.
+    """
+
+    def __init__(self):
+        self._frames: Dict[UUID, FrameSnapshot] = {}
+
+    def reset(self):
+        self._frames.clear()
+
+    def freeze(self, animations: Iterable[Animation]) -> CollectionSnapshot:
+        frames: Dict[UUID, FrameSnapshot] = {}
+        snapshot = tuple(
+            self._freeze_animation(animation, frames) for animation in animations
+        )
+
+        # Keep only the chunks still in use
+        self._frames = frames
+        return snapshot
+
+    def _freeze_animation(
+        self, animation: Animation, frames: Dict[UUID, FrameSnapshot]
+    ) -> AnimationSnapshot:
+        lazy = isinstance(animation.frames, LazyFrameList)
+
+        for row in range(len(animation.frames)):
+            location = animation.frames.clean_location(row) if lazy else None
+            if location is not None:
+                frame_id = animation.frames.frame_ids()[row]
+                version = location
+            else:
+                frame = animation.frames[row]
+                frame_id, version = frame.id, frame.revision
+
+            cached = self._frames.get(frame_id)
+            if cached is None or cached.version != version:
+                if location is not None:
+                    chunk = animation.frames.raw_chunk(row)
+                else:
+                    chunk = encode_frame(animation.frames[row])
+                cached = FrameSnapshot(frame_id, version, chunk)
+
+            frames[frame_id] = cached
+
+        return AnimationSnapshot(
+            animation.id,
+            animation.name,
+            tuple(frames[frame_id] for frame_id in _frame_ids(animation)),
+        )
+
+
+def _frame_ids(animation: Animation) -> List[UUID]:
+    if isinstance(animation.frames, LazyFrameList):
+        return animation.frames.frame_ids()
+    return [frame.id for frame in animation.frames]
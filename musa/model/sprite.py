@@ -15,7 +15,15 @@ class Sprite(Serializable):
     alpha: int = 0
     visible: bool = True
 
-    def update(self, **kwargs) -> None:
+    @property
+    def opacity(self) -> float:
+        """Alpha is the transparency in percent, like the inspector slider"""
+        return min(max(100 - self.alpha, 0), 100) / 100
+
+    def update(self, **kwargs) -> bool:
+        changed = False
         for key, value in kwargs.items():
-            if hasattr(self, key):
+            if hasattr(self, key) and getattr(self, key) != value:
                 setattr(self, key, value)
+                changed = True
+        return changed
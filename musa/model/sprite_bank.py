@@ -0,0 +1,50 @@
+import hashlib
+from typing import Dict, Iterable, List
+
+from . import journal
+
+
+class SpriteBank:
+    """Sprite images by sprite index, saved along with the animations.
+
+    Images are kept encoded, as PNG, so the model doesn't depend on how they
+    are shown. Equal images share an index, and images are never removed, so
+    an index stays valid for the life of the project.
+    """
+
+    def __init__(self, images: Iterable[bytes] = ()):
+        self.images: List[bytes] = []
+        self._indices: Dict[bytes, int] = {}
+        self.load(images)
+
+    def load(self, images: Iterable[bytes]):
+        """Replace every image, like when another project is opened"""
+        self.images = []
+        self._indices.clear()
+        for image in images:
+            self._append(image)
+
+    def add(self, image: bytes) -> int:
+        """Sprite index of an encoded image, added if it's not in the bank yet"""
+        if (index := self._indices.get(self._key(image))) is not None:
+            return index
+
+        index = self._append(image)
+        journal.record(journal.Op.ADD_IMAGE, index, image)
+        return index
+
+    def _append(self, image: bytes) -> int:
+        index = len(self.images)
+        self.images.append(image)
+        self._indices.setdefault(self._key(image), index)
+        return index
+
+    @staticmethod
+    def _key(image: bytes) -> bytes:
+        return hashlib.blake2b(image).digest()
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.images[index]
+
+    def __len__(self) -> int:
+        return len(self.images)
@@ -0,0 +1,45 @@
+from typing import Callable, List, Tuple
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from musa.model.observable import Signal
+
+
+class SignalBridge(QObject):
+    """Deliver model signals to Qt code through a Qt signal.
+
+    Slots run right away when the model emits on the thread of the bridge, and
+    are queued to it otherwise. The model connections are dropped with the
+    bridge, so they never call into a deleted widget.
+    """
+
+    _relay = pyqtSignal(object, tuple)  # slot, arguments
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._connections: List[Tuple[Signal, Callable]] = []
+        self._relay.connect(self._deliver)
+
+        connections = self._connections
+        self.destroyed.connect(lambda: SignalBridge._disconnect(connections))
+
+    def connect(self, signal: Signal, slot: Callable):
+        relay = self._relay
+
+        def forward(*args):
+            relay.emit(slot, args)
+
+        signal.connect(forward)
+        self._connections.append((signal, forward))
+
+    def disconnect_all(self):
+        self._disconnect(self._connections)
+
+    @staticmethod
+    def _disconnect(connections: List[Tuple[Signal, Callable]]):
+        for signal, forward in connections:
+            signal.disconnect(forward)
+        connections.clear()
+
+    def _deliver(self, slot: Callable, args: tuple):
+        slot(*args)
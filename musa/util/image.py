@@ -1,10 +1,15 @@
 import random
+import sys
 from typing import List
 
-from PyQt5.QtCore import QPoint, QRectF, QSize, Qt
-from PyQt5.QtGui import QColor, QImage, QPainter, QPainterPath, QPen, QPixmap, qAlpha
+import numpy as np
+from PyQt5.QtCore import QPoint, QRect, QRectF, QSize, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter, QPainterPath, QPen, QPixmap
 from PyQt5.QtWidgets import QGraphicsItem, QGraphicsPixmapItem, QGraphicsScene
 
+# Byte holding the alpha value of a 32 bit ARGB pixel in memory
+_ALPHA_BYTE = 3 if sys.byteorder == "little" else 0
+
 
 class Image:
     @staticmethod
@@ -66,16 +71,79 @@ class Image:
         cols = (img_width + space_x) // total_width
         rows = (img_height + space_y) // total_height
 
-        # Draw frame boundaries
-        for row in range(rows):
-            for col in range(cols):
-                x = offset_x + col * total_width
-                y = offset_y + row * total_height
-                painter.drawRect(x, y, frame_width, frame_height)
+        if cols > 0 and rows > 0:
+            # Draw a single frame boundary and tile it over the whole grid. Without
+            # spacing frames share edges, so the tile also needs the dashes of its
+            # neighbours. Clipping would restart the dashes, so the neighbours are
+            # drawn whole in a 2x2 block and the tile is cut from the last frame.
+            block = QPixmap(2 * total_width + 1, 2 * total_height + 1)
+            block.fill(Qt.transparent)
+            with QPainter(block) as block_painter:
+                block_painter.setPen(pen)
+                for x in (0, total_width):
+                    for y in (0, total_height):
+                        block_painter.drawRect(x, y, frame_width, frame_height)
+            tile = block.copy(total_width, total_height, total_width, total_height)
+
+            painter.drawTiledPixmap(
+                offset_x, offset_y, cols * total_width, rows * total_height, tile
+            )
+
+            # The outer edges have no neighbour, redraw them from their own frames
+            first_col = [
+                QRect(
+                    offset_x, offset_y + row * total_height, frame_width, frame_height
+                )
+                for row in range(rows)
+            ]
+            first_row = [
+                QRect(offset_x + col * total_width, offset_y, frame_width, frame_height)
+                for col in range(cols)
+            ]
+            last_col = [
+                rect.translated((cols - 1) * total_width, 0) for rect in first_col
+            ]
+            last_row = [
+                rect.translated(0, (rows - 1) * total_height) for rect in first_row
+            ]
+
+            strips = []
+            if space_x == 0:
+                strips.append((QRect(offset_x, 0, 1, size.height()), first_col))
+                strips.append(
+                    (QRect(last_col[0].right() + 1, 0, 1, size.height()), last_col)
+                )
+            if space_y == 0:
+                strips.append((QRect(0, offset_y, size.width(), 1), first_row))
+                strips.append(
+                    (QRect(0, last_row[0].bottom() + 1, size.width(), 1), last_row)
+                )
+
+            for strip, rects in strips:
+                painter.setClipRect(strip)
+                painter.setCompositionMode(QPainter.CompositionMode_Clear)
+                painter.fillRect(strip, Qt.transparent)
+                painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+                painter.drawRects(rects)
 
         painter.end()
         return grid_pixmap
 
+    @staticmethod
+    def regions(size: QSize, rects: List[QRect]) -> QPixmap:
+        regions_pixmap = QPixmap(size)
+        regions_pixmap.fill(Qt.transparent)
+        painter = QPainter(regions_pixmap)
+        pen = QPen(QColor(220, 220, 220), 1, Qt.DashLine)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+
+        # Outline the regions just outside their bounds
+        painter.drawRects([rect.adjusted(-1, -1, 0, 0) for rect in rects])
+
+        painter.end()
+        return regions_pixmap
+
     @staticmethod
     def remove_background(image: QImage, bg_color: QColor):
         pixmap = QPixmap.fromImage(image)
@@ -83,13 +151,191 @@ class Image:
 
         return pixmap.toImage()
 
+    @staticmethod
+    def to_argb32(image: QImage) -> QImage:
+        """Return the image in a 32 bit format with the alpha in the high byte"""
+        if image.format() in (
+            QImage.Format_ARGB32,
+            QImage.Format_ARGB32_Premultiplied,
+            QImage.Format_RGB32,
+        ):
+            return image
+        return image.convertToFormat(QImage.Format_ARGB32)
+
+    @staticmethod
+    def pixels(image: QImage) -> np.ndarray:
+        """Zero-copy (height, width) view of the ARGB pixels of a 32 bit image.
+
+        The view points straight into the image bits, so the image must outlive it.
+        """
+        bits = image.constBits()
+        bits.setsize(image.height() * image.bytesPerLine())
+        pixels = np.frombuffer(bits, np.uint32).reshape(
+            image.height(), image.bytesPerLine() // 4
+        )
+        return pixels[:, : image.width()]
+
+    @staticmethod
+    def alpha_channel(image: QImage) -> np.ndarray:
+        """Zero-copy (height, width) view of the alpha channel of a 32 bit image"""
+        return Image.pixels(image).view(np.uint8)[:, _ALPHA_BYTE::4]
+
+    @staticmethod
+    def opaque_cells(
+        image: QImage,
+        frame_width: int,
+        frame_height: int,
+        offset_x: int = 0,
+        offset_y: int = 0,
+        space_x: int = 0,
+        space_y: int = 0,
+    ) -> np.ndarray:
+        """(rows, cols) mask of the grid cells holding at least one opaque pixel"""
+        total_width = frame_width + space_x
+        total_height = frame_height + space_y
+
+        cols = max(0, (image.width() - offset_x + space_x) // total_width)
+        rows = max(0, (image.height() - offset_y + space_y) // total_height)
+
+        alpha = Image.alpha_channel(image)[offset_y:, offset_x:]
+        row_stride, col_stride = alpha.strides
+
+        # Every cell as a strided window over the same buffer, no pixel is copied
+        cells = np.lib.stride_tricks.as_strided(
+            alpha,
+            shape=(rows, cols, frame_height, frame_width),
+            strides=(
+                total_height * row_stride,
+                total_width * col_stride,
+                row_stride,
+                col_stride,
+            ),
+            writeable=False,
+        )
+        return cells.any(axis=(2, 3))
+
+    @staticmethod
+    def opaque_regions(image: QImage) -> List[QRect]:
+        """Tight bounds of the 8-connected opaque regions, in reading order"""
+        image = Image.to_argb32(image)
+        alpha = Image.alpha_channel(image)
+        height, width = alpha.shape
+
+        # Opaque mask with a transparent column on each side
+        opaque = np.zeros((height, width + 2), bool)
+        np.not_equal(alpha, 0, out=opaque[:, 1:-1])
+
+        # Horizontal runs of opaque pixels in row major order, ends are exclusive.
+        # Each row starts and ends transparent, so the changes come in pairs and
+        # alternate between the start and the end of a run.
+        changes = opaque[:, 1:] != opaque[:, :-1]
+        keys = np.flatnonzero(changes)
+        stride = width + 1
+        count = len(keys) // 2
+
+        if count == 0:
+            return []
+
+        # Number of changes before each key of the mask, a run above starts at
+        # an even change and ends at an odd one
+        before = np.zeros(changes.size + 1, np.int32)
+        np.cumsum(changes.ravel(), out=before[1:])
+
+        # Runs of the row above touching each run, diagonals included: the first
+        # one ending at or after its start, up to the last one starting at or
+        # before its end. Runs are sorted and disjoint, so they form a range.
+        starts, ends = keys[0::2], keys[1::2]
+        first = before[np.maximum(starts - stride, 0)] // 2
+        last = (before[np.maximum(ends - stride + 1, 0)] + 1) // 2
+        run_rows, run_starts = np.divmod(starts, stride)
+        run_ends = ends - run_rows * stride
+        del before
+
+        # Each run hangs under the leftmost run it touches, which always comes
+        # first, so following the parents leads to the first run of the region
+        labels = np.arange(count)
+        touching = first < last
+        labels[touching] = first[touching]
+        while not np.array_equal(roots := labels[labels], labels):
+            labels = roots
+
+        # Runs bridging several runs above join their regions
+        bridging = np.flatnonzero(last - first > 1)
+        if len(bridging):
+            extra = last[bridging] - first[bridging] - 1
+            src = np.repeat(bridging, extra)
+            dst = np.arange(len(src)) + np.repeat(
+                first[bridging] + 1 - np.cumsum(extra) + extra, extra
+            )
+            labels = Image._merge_labels(labels, labels[src], labels[dst])
+
+        # Roots are the first run of each region, that gives the reading order
+        is_root = labels == np.arange(count)
+        roots = np.flatnonzero(is_root)
+        region = (np.cumsum(is_root) - 1)[labels]
+        left = np.full(len(roots), width)
+        right = np.zeros(len(roots), np.intp)
+        bottom = np.zeros(len(roots), np.intp)
+        np.minimum.at(left, region, run_starts)
+        np.maximum.at(right, region, run_ends)
+        np.maximum.at(bottom, region, run_rows + 1)
+        top = run_rows[roots]
+
+        return [
+            QRect(x, y, w, h)
+            for x, y, w, h in zip(
+                left.tolist(),
+                top.tolist(),
+                (right - left).tolist(),
+                (bottom - top).tolist(),
+            )
+        ]
+
+    @staticmethod
+    def _merge_labels(
+        labels: np.ndarray, src: np.ndarray, dst: np.ndarray
+    ) -> np.ndarray:
+        """Join the regions of each pair of labels, runs take the lowest label"""
+        pending = src != dst
+        src, dst = src[pending], dst[pending]
+
+        # Union find over the merged labels only, renumbered from zero
+        merged = np.zeros(len(labels), bool)
+        merged[src] = merged[dst] = True
+        nodes = np.flatnonzero(merged)
+        index = np.cumsum(merged) - 1
+        src, dst = index[src], index[dst]
+
+        # Every tree points to its lowest node, like nodes point to lower labels
+        parents = np.arange(len(nodes))
+        while len(src):
+            src_roots = parents[src]
+            dst_roots = parents[dst]
+            pending = src_roots != dst_roots
+            if not pending.any():
+                break
+
+            # Settled edges never split again
+            src, dst = src[pending], dst[pending]
+            src_roots, dst_roots = src_roots[pending], dst_roots[pending]
+
+            # Hook the higher root under the lower one and flatten the trees
+            np.minimum.at(
+                parents,
+                np.maximum(src_roots, dst_roots),
+                np.minimum(src_roots, dst_roots),
+            )
+            while not np.array_equal(roots := parents[parents], parents):
+                parents = roots
+
+        relabel = np.arange(len(labels))
+        relabel[nodes] = nodes[parents]
+        return relabel[labels]
+
     @staticmethod
     def is_transparent(image: QImage) -> bool:
-        for y in range(image.height()):
-            for x in range(image.width()):
-                if qAlpha(image.pixel(x, y)) != 0:
-                    return False
-        return True
+        image = Image.to_argb32(image)
+        return not Image.alpha_channel(image).any()
 
     @staticmethod
     def set_alpha(alpha: int, pixmap: QPixmap) -> QPixmap:
@@ -182,25 +428,3 @@ class Image:
             random.randint(0, 255),
         ]
         return QColor(*color)
-
-    @staticmethod
-    def extract_sprites(
-        image: QImage,
-        frame_width: int,
-        frame_height: int,
-        offset_x: int = 0,
-        offset_y: int = 0,
-    ) -> List[QPixmap]:
-        cols = (image.width() - offset_x) // frame_width
-        rows = (image.height() - offset_y) // frame_height
-
-        sprites = []
-
-        for row in range(rows):
-            for col in range(cols):
-                x = (col * frame_width) + offset_x
-                y = (row * frame_height) + offset_y
-                sprite = image.copy(x, y, frame_width, frame_height)
-                if not Image.is_transparent(sprite):
-                    sprites.append(QPixmap.fromImage(sprite))
-        return sprites
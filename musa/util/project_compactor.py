@@ -0,0 +1,73 @@
+from pathlib import Path
+from typing import Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from musa.model.project_file import ProjectFile
+
+
+class CompactionSignals(QObject):
+    compacted = pyqtSignal(int, str, dict)  # generation, compacted file, relocations
+    failed = pyqtSignal(str)  # error message
+
+
+class CompactionWorker(QRunnable):
+    """Copy the live chunks of a project file into a new file.
+
+    The project file is append only, so the worker can read it while the GUI
+    thread keeps saving. The copy is only swapped in if no save happened since.
+    """
+
+    def __init__(self, path: Path, generation: int, signals: CompactionSignals):
+        super().__init__()
+        self.path = path
+        self.generation = generation
+        self.signals = signals
+
+    def run(self):
+        tmp_path = self.path.with_name(self.path.name + ".compact")
+        try:
+            relocations = ProjectFile.compact(self.path, tmp_path)
+        except (OSError, ValueError) as e:
+            self.signals.failed.emit(str(e))
+            return
+
+        self.signals.compacted.emit(self.generation, str(tmp_path), relocations)
+
+
+class ProjectCompactor(QObject):
+    """Compact a project file in the background once it has enough garbage"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.project: Optional[ProjectFile] = None
+        self._compacting: Optional[ProjectFile] = None
+
+        self.signals = CompactionSignals(self)
+        self.signals.compacted.connect(self._on_compacted)
+        self.signals.failed.connect(self._on_failed)
+
+    def set_project(self, project: ProjectFile):
+        self.project = project
+
+    def check(self):
+        if self._compacting or not self.project or not self.project.needs_compaction():
+            return
+
+        self._compacting = self.project
+        worker = CompactionWorker(
+            self.project.path, self.project.generation, self.signals
+        )
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_compacted(self, generation: int, tmp_path: str, relocations: dict):
+        project, self._compacting = self._compacting, None
+
+        # The project may have been closed or replaced while compacting
+        if project is self.project:
+            project.finish_compaction(generation, tmp_path, relocations)
+        else:
+            Path(tmp_path).unlink(missing_ok=True)
+
+    def _on_failed(self, message: str):
+        self._compacting = None
@@ -0,0 +1,216 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from PyQt5.QtCore import QObject, QRect, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+from musa.util.image import Image
+from musa.util.sprite_index import Digests, SpriteIndex, SpriteMatch
+
+
+class BandSignals(QObject):
+    bandExtracted = pyqtSignal(int, list, list)  # band index, QImages, digests
+
+
+class BandWorker(QRunnable):
+    """Copy the cells of one row band out of the sheet.
+
+    Only QImage work happens here, pixmaps can only be created on the GUI thread.
+    """
+
+    def __init__(
+        self,
+        extractor: "SpriteExtractor",
+        band: int,
+        rects: List[QRect],
+    ):
+        super().__init__()
+        self.extractor = extractor
+        self.image = extractor.image
+        self.signals = extractor.band_signals
+        self.band = band
+        self.rects = rects
+
+    def run(self):
+        images = []
+        digests = []
+        for rect in self.rects:
+            if self.extractor.is_canceled():
+                break
+            image = self.image.copy(rect)
+            images.append(image)
+
+            # Hashing is the costly part of deduplication, keep it off the GUI thread
+            if self.extractor.index is not None:
+                digests.append(SpriteIndex.digests(Image.pixels(image)))
+
+        # Always report back, the extractor waits for every band before finishing
+        self.signals.bandExtracted.emit(self.band, images, digests)
+
+
+class RegionSignals(QObject):
+    regionsFound = pyqtSignal(int, list)  # request number, QRects
+
+
+class RegionWorker(QRunnable):
+    """Find the opaque regions of a sheet, noisy sheets take seconds"""
+
+    def __init__(self, image: QImage, request: int, signals: RegionSignals):
+        super().__init__()
+        self.image = image
+        self.request = request
+        self.signals = signals
+
+    def run(self):
+        self.signals.regionsFound.emit(self.request, Image.opaque_regions(self.image))
+
+
+class SpriteExtractor(QObject):
+    """Extract the sprites of a sheet on the global thread pool.
+
+    The sheet is split in bands of grid rows, each band is copied by a worker and
+    the results are streamed back in sheet order. When deduplicating, exact copies
+    are dropped and a mirrored copy is streamed once as its canonical pixmap along
+    with the flips that recreate it.
+    """
+
+    spritesExtracted = pyqtSignal(list)  # batch of (QPixmap, SpriteMatch), in order
+    progressChanged = pyqtSignal(int, int)  # processed cells, total cells
+    finished = pyqtSignal()  # all workers are done, also after a cancel
+
+    def __init__(
+        self,
+        image: QImage,
+        bands: List[List[QRect]],
+        deduplicate: bool = False,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.image = Image.to_argb32(image)
+        self.bands = [band for band in bands if band]
+        self.total = sum(len(band) for band in self.bands)
+        self.done = 0
+
+        self.index: Optional[SpriteIndex] = SpriteIndex() if deduplicate else None
+
+        # Canonical pixmaps by sprite index, and the matches already streamed
+        self.sprites: List[QPixmap] = []
+        self._streamed: Set[SpriteMatch] = set()
+
+        self._canceled = False
+        self._received = 0
+        self._next_band = 0
+        self._pending: Dict[int, Tuple[List[QImage], List[Digests]]] = {}
+
+        self.band_signals = BandSignals(self)
+        self.band_signals.bandExtracted.connect(self._on_band_extracted)
+
+    @classmethod
+    def from_grid(
+        cls,
+        image: QImage,
+        frame_width: int,
+        frame_height: int,
+        offset_x: int = 0,
+        offset_y: int = 0,
+        space_x: int = 0,
+        space_y: int = 0,
+        deduplicate: bool = False,
+        parent=None,
+    ) -> "SpriteExtractor":
+        image = Image.to_argb32(image)
+        opaque = Image.opaque_cells(
+            image, frame_width, frame_height, offset_x, offset_y, space_x, space_y
+        )
+
+        rows_per_band = cls._band_size(len(opaque))
+
+        bands = []
+        for first_row in range(0, len(opaque), rows_per_band):
+            band = []
+            rows = opaque[first_row : first_row + rows_per_band]
+            for row, col in np.argwhere(rows).tolist():
+                x = offset_x + col * (frame_width + space_x)
+                y = offset_y + (first_row + row) * (frame_height + space_y)
+                band.append(QRect(x, y, frame_width, frame_height))
+            bands.append(band)
+
+        return cls(image, bands, deduplicate, parent)
+
+    @classmethod
+    def from_regions(
+        cls,
+        image: QImage,
+        rects: List[QRect],
+        deduplicate: bool = False,
+        parent=None,
+    ) -> "SpriteExtractor":
+        # Regions come in reading order, so consecutive chunks behave as row bands
+        size = cls._band_size(len(rects))
+        bands = [rects[i : i + size] for i in range(0, len(rects), size)]
+
+        return cls(image, bands, deduplicate, parent)
+
+    @staticmethod
+    def _band_size(count: int) -> int:
+        # A few bands per thread so the pool stays busy until the end
+        threads = QThreadPool.globalInstance().maxThreadCount()
+        return max(1, count // (threads * 4))
+
+    def start(self):
+        if not self.bands:
+            self.finished.emit()
+            return
+
+        pool = QThreadPool.globalInstance()
+        for band, rects in enumerate(self.bands):
+            pool.start(BandWorker(self, band, rects))
+
+    def cancel(self):
+        self._canceled = True
+        self._pending.clear()
+
+    def is_canceled(self) -> bool:
+        return self._canceled
+
+    def _on_band_extracted(
+        self, band: int, images: List[QImage], digests: List[Digests]
+    ):
+        self._received += 1
+
+        if not self._canceled:
+            self._pending[band] = (images, digests)
+            self._release_pending()
+
+        if self._received == len(self.bands):
+            self.finished.emit()
+
+    def _release_pending(self):
+        # Release the bands that are already contiguous
+        batch = []
+        done = self.done
+        while self._next_band in self._pending:
+            images, digests = self._pending.pop(self._next_band)
+            self._next_band += 1
+            self.done += len(images)
+
+            for i, image in enumerate(images):
+                # Bands are merged in order, so the first copy is the canonical one
+                if self.index is None:
+                    match, new = SpriteMatch(len(self.sprites), False, False), True
+                else:
+                    match, new = self.index.add(digests[i])
+
+                if new:
+                    self.sprites.append(QPixmap.fromImage(image))
+                elif match in self._streamed:
+                    continue
+
+                # Mirrored copies reuse the canonical pixmap
+                self._streamed.add(match)
+                batch.append((self.sprites[match.index], match))
+
+        if batch:
+            self.spritesExtracted.emit(batch)
+        if self.done != done:
+            self.progressChanged.emit(self.done, self.total)
@@ -0,0 +1,65 @@
+import hashlib
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+Digests = Tuple[bytes, bytes, bytes, bytes]  # as is, h flip, v flip, hv flip
+
+
+class SpriteMatch(NamedTuple):
+    """Canonical sprite and the flips that turn it into the matched sprite.
+
+    The flags map directly onto Sprite.h_flip and Sprite.v_flip.
+    """
+
+    index: int
+    h_flip: bool
+    v_flip: bool
+
+
+class SpriteIndex:
+    """Content hash index of extracted sprites.
+
+    Every new sprite registers the digest of its pixels and of its three mirrored
+    copies, so a later duplicate, flipped or not, resolves to the first one.
+    """
+
+    # Flips applied to the canonical pixels, in the same order as the digests
+    _FLIPS = ((False, False), (True, False), (False, True), (True, True))
+
+    def __init__(self):
+        self.count = 0
+        self._digests: Dict[bytes, SpriteMatch] = {}
+
+    @staticmethod
+    def digests(pixels: np.ndarray) -> Digests:
+        """Digests of a (height, width) array of ARGB32 pixels and its flips"""
+        # Transparent pixels may hold any color, they must hash the same
+        pixels = np.where(pixels >> 24 == 0, np.uint32(0), pixels)
+        shape = np.array(pixels.shape, np.uint32).tobytes()
+
+        return tuple(
+            hashlib.blake2b(
+                shape + np.ascontiguousarray(variant).tobytes(), digest_size=16
+            ).digest()
+            for variant in (
+                pixels,
+                pixels[:, ::-1],
+                pixels[::-1, :],
+                pixels[::-1, ::-1],
+            )
+        )
+
+    def add(self, digests: Digests) -> Tuple[SpriteMatch, bool]:
+        """Match a sprite against the index, registering it when it is new"""
+        if match := self._digests.get(digests[0]):
+            return match, False
+
+        match = SpriteMatch(self.count, False, False)
+        self.count += 1
+
+        # Symmetric sprites keep the unflipped match
+        for digest, (h_flip, v_flip) in zip(digests, self._FLIPS):
+            self._digests.setdefault(digest, SpriteMatch(match.index, h_flip, v_flip))
+
+        return match, True
@@ -1,9 +1,12 @@
-from PyQt5.QtWidgets import QVBoxLayout, QWidget
+from PyQt5.QtWidgets import QCheckBox, QHBoxLayout, QSpinBox, QVBoxLayout, QWidget
 
+from musa.manager.playback import PlaybackEngine
 from musa.model.animation import Animation
 from musa.model.frame import Frame
+from musa.model.sprite_bank import SpriteBank
 from musa.widget.editor import EditorScene, EditorView
 from musa.widget.event_filter import PanControl, ZoomControl
+from musa.widget.playback_control import PlayBackWidget
 
 
 class EditorWidget(QWidget):
@@ -16,12 +19,55 @@ class EditorWidget(QWidget):
         PanControl(self.view)
         ZoomControl(self.view)
 
+        self.playback = PlaybackEngine(self)
+        self.playback_control = PlayBackWidget()
+        self.playback_control.connect_engine(self.playback)
+        self.playback.frameChanged.connect(self._on_playback_frame)
+        self.playback.playingChanged.connect(self._on_playing_changed)
+
+        self.onion_check = QCheckBox("Onion skin")
+        self.onion_spin = QSpinBox()
+        self.onion_spin.setRange(1, 5)
+        self.onion_spin.setValue(3)
+        self.onion_spin.setToolTip("Frames shown before and after")
+        self.onion_check.toggled.connect(self._on_onion_changed)
+        self.onion_spin.valueChanged.connect(self._on_onion_changed)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.playback_control, 1)
+        controls.addWidget(self.onion_check)
+        controls.addWidget(self.onion_spin)
+
         layout = QVBoxLayout()
         layout.addWidget(self.view)
+        layout.addLayout(controls)
         self.setLayout(layout)
 
     def set_frame(self, frame: Frame):
         self.scene.set_frame(frame)
 
+    def refresh(self):
+        self.scene.refresh()
+
+    def set_sprite_bank(self, bank: SpriteBank):
+        self.scene.set_sprite_bank(bank)
+
     def set_animation(self, animation: Animation):
         self.scene.set_animation(animation)
+        self.playback.set_animation(animation)
+
+    def _on_playback_frame(self, row: int):
+        frame = self.scene.current_animation.frames[row]
+        if self.playback.is_playing():
+            self.scene.show_composite(frame)
+        else:
+            self.scene.set_frame(frame)
+
+    def _on_onion_changed(self):
+        frames = self.onion_spin.value() if self.onion_check.isChecked() else 0
+        self.scene.set_onion_skin(frames, frames)
+
+    def _on_playing_changed(self, playing: bool):
+        # Back to editable sprites on the frame playback stopped at
+        if not playing and self.scene.current_frame:
+            self.scene.set_frame(self.scene.current_frame)
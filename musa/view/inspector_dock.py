@@ -16,6 +16,10 @@ class InspectorDock(QWidget):
 
     def set_frame(self, frame: Frame):
         self.sprite_list.set_frame(frame)
+        self.inspector.set_frame(frame)
+
+    def refresh(self):
+        self.sprite_list.refresh()
 
     def setup_ui(self):
         layout = QVBoxLayout()
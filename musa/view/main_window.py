@@ -1,7 +1,18 @@
-from PyQt5.QtWidgets import QMainWindow
+import zlib
+from pathlib import Path
+from typing import Optional
 
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWidgets import QMainWindow, QMessageBox
+
+from musa.dialog import FileDialogFactory
 from musa.manager import DockConfig, DockManager
+from musa.manager.autosave import AutoSaver
+from musa.model import history, journal
 from musa.model.animation_collection import AnimationCollection
+from musa.model.project_file import ProjectFile
+from musa.util.project_compactor import ProjectCompactor
 from musa.widget.palette import SpritePaletteWidget
 
 from .animation_dock import AnimationDock
@@ -10,6 +21,11 @@ from .inspector_dock import InspectorDock
 
 
 class MusaMainWindow(QMainWindow):
+    PROJECT_FILTER = "M.U.S.E Project (*.musa)"
+    JOURNAL_SUFFIX = ".journal"
+    JOURNAL_FLUSH_INTERVAL = 1000
+    HISTORY_BUDGET = 4 * 1024 * 1024
+
     def __init__(self):
         super().__init__()
         self.setMinimumSize(800, 600)
@@ -20,19 +36,223 @@ class MusaMainWindow(QMainWindow):
 
         # Main document model
         self.animation_collection = AnimationCollection()
+        self.project_file: Optional[ProjectFile] = None
+        self.compactor = ProjectCompactor(self)
+        self.autosaver = AutoSaver(self.animation_collection, self)
+
+        # Edits since the last save, flushed to disk in batches
+        self.edit_journal: Optional[journal.Journal] = None
+        self.journal_timer = QTimer(self)
+        self.journal_timer.timeout.connect(self._flush_journal)
+        self.journal_timer.start(self.JOURNAL_FLUSH_INTERVAL)
+
+        self.history = history.History(self.HISTORY_BUDGET)
+        history.activate(self.history)
 
         self.setup_ui()
+        self.setup_menus()
         self.connections()
 
+        # Ask once the window is up
+        QTimer.singleShot(0, self._recover_untitled)
+
     def connections(self):
         self.animation.frameSelected.connect(self.inspector.set_frame)
         self.animation.frameSelected.connect(self.editor.set_frame)
         self.animation.animationSelected.connect(self.editor.set_animation)
 
+        # Sprite images come with the project
+        bank = self.animation_collection.sprite_bank
+        self.editor.set_sprite_bank(bank)
+        self.animation_collection.signals.collectionLoaded.connect(
+            lambda: self.editor.set_sprite_bank(bank)
+        )
+
         # Enable editing when a new animation is created
         self.animation_collection.signals.animationAdded.connect(
             lambda x: self.editor.setEnabled(True)
         )
+        self.animation_collection.signals.collectionLoaded.connect(
+            lambda: self.editor.setEnabled(bool(self.animation_collection.animations))
+        )
+
+        # Deltas of another collection can't be undone on this one
+        self.animation_collection.signals.collectionLoaded.connect(self.history.clear)
+        self.history.changed.connect(self._on_history_changed)
+
+    def setup_menus(self):
+        file_menu = self.menuBar().addMenu("&File")
+        file_menu.addAction("&Open...", self.open_project, QKeySequence.Open)
+        file_menu.addAction("&Save", self.save_project, QKeySequence.Save)
+        file_menu.addAction("Save &As...", self.save_project_as, QKeySequence.SaveAs)
+
+        edit_menu = self.menuBar().addMenu("&Edit")
+        edit_menu.addAction("&Undo", self.history.undo, QKeySequence.Undo)
+        edit_menu.addAction("&Redo", self.history.redo, QKeySequence.Redo)
+
+    def _on_history_changed(self):
+        # Undone sprite edits only change the frame, refresh what shows it
+        self.editor.refresh()
+        self.inspector.refresh()
+
+    def open_project(self):
+        if path := FileDialogFactory.open_file(self.PROJECT_FILTER):
+            self._open_project(self._recover_autosave(path))
+
+    def _open_project(self, path: Path):
+        try:
+            project = ProjectFile(path)
+            animations = project.read_animations()
+            images = project.read_images()
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Open Project", f"Could not open {path}: {e}")
+            return
+
+        self._set_project(project)
+        self.animation_collection.load_animations(animations, images)
+        self._replay_journal()
+
+    def save_project(self):
+        if not self.project_file:
+            self.save_project_as()
+            return
+
+        # Only the frames changed since the last save are appended
+        dirty = self.animation_collection.commit_all_changes()
+        try:
+            self.project_file.save(
+                self.animation_collection.list_animations(),
+                dirty,
+                self.animation_collection.sprite_bank.images,
+            )
+        except (OSError, ValueError) as e:
+            path = self.project_file.path
+            QMessageBox.warning(self, "Save Project", f"Could not save {path}: {e}")
+            return
+
+        self.edit_journal.truncate()
+        self.autosaver.discard()
+        self.compactor.check()
+
+    def save_project_as(self):
+        if path := FileDialogFactory.save_file(self.PROJECT_FILTER, ".musa"):
+            self._write_project(path)
+
+    def _write_project(self, path):
+        self.animation_collection.commit_all_changes()
+        try:
+            project = ProjectFile.write(
+                path,
+                self.animation_collection.list_animations(),
+                self.animation_collection.sprite_bank.images,
+            )
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Save Project", f"Could not save {path}: {e}")
+            return
+
+        # The edits of the previous location are in the new file now
+        old_journal = self.edit_journal.path if self.edit_journal else None
+
+        # Drop the autosave of the previous location, then the new one
+        self.autosaver.discard()
+        self._set_project(project)
+        self.autosaver.discard()
+
+        if old_journal and old_journal != self.edit_journal.path:
+            old_journal.unlink(missing_ok=True)
+        self.edit_journal.truncate()
+
+    def _set_project(self, project: ProjectFile):
+        if self.project_file and self.project_file is not project:
+            self.project_file.close()
+        self.project_file = project
+        self.compactor.set_project(project)
+        self.autosaver.set_project_path(project.path)
+
+        if self.edit_journal:
+            self.edit_journal.close()
+        self.edit_journal = journal.Journal(
+            project.path.with_name(project.path.name + self.JOURNAL_SUFFIX)
+        )
+        journal.activate(self.edit_journal)
+
+    def _replay_journal(self):
+        records = self.edit_journal.recovered
+        if not records:
+            return
+
+        answer = QMessageBox.question(
+            self,
+            "Open Project",
+            f"{len(records)} edits were made to {self.project_file.path.name} "
+            "after it was last saved.\nReplay them?",
+        )
+        if answer == QMessageBox.Yes:
+            self.animation_collection.replay_journal(records)
+        else:
+            self.edit_journal.truncate()
+
+    def _flush_journal(self):
+        if self.edit_journal:
+            self.edit_journal.flush()
+
+    def closeEvent(self, event):
+        if self.edit_journal:
+            journal.activate(None)
+            self.edit_journal.close()
+        super().closeEvent(event)
+
+    def _recover_autosave(self, path: Path) -> Path:
+        autosave = path.with_name(path.name + AutoSaver.SUFFIX)
+        if not autosave.exists():
+            return path
+        if path.exists() and autosave.stat().st_mtime <= path.stat().st_mtime:
+            return path
+
+        answer = QMessageBox.question(
+            self,
+            "Open Project",
+            f"{path.name} has autosaved changes that were never saved.\n"
+            "Recover them into a copy of the project?",
+        )
+        if answer != QMessageBox.Yes:
+            return path
+
+        recovered = path.with_name(f"{path.stem}.recovered{path.suffix}")
+        try:
+            AutoSaver.restore(autosave, recovered)
+        except (OSError, zlib.error) as e:
+            QMessageBox.warning(self, "Open Project", f"Could not recover: {e}")
+            return path
+        return recovered
+
+    def _recover_untitled(self):
+        autosave = AutoSaver.untitled_path()
+        if not autosave.exists():
+            return
+
+        answer = QMessageBox.question(
+            self,
+            "Recover Project",
+            "An untitled project has autosaved changes that were never saved.\n"
+            "Recover them into a new project?",
+        )
+        if answer != QMessageBox.Yes:
+            autosave.unlink(missing_ok=True)
+            return
+
+        # Offered again on the next start if no file is picked
+        if not (path := FileDialogFactory.save_file(self.PROJECT_FILTER, ".musa")):
+            return
+
+        try:
+            AutoSaver.restore(autosave, path)
+        except (OSError, zlib.error) as e:
+            QMessageBox.warning(self, "Recover Project", f"Could not recover: {e}")
+            return
+
+        autosave.unlink(missing_ok=True)
+        self._open_project(path)
 
     def setup_ui(self):
         self.editor = EditorWidget()
@@ -22,6 +22,7 @@ from musa.dialog import FileDialogFactory
 from musa.manager import ResourceManager
 from musa.model.animation import Animation
 from musa.model.animation_collection import AnimationCollection
+from musa.model_adapter.signal_bridge import SignalBridge
 from musa.widget.button import IconButton
 
 
@@ -52,9 +53,11 @@ class AnimationListModel(QAbstractListModel):
         self.animations: List[UUID] = []
 
         # connect to collection signals
-        self.collection.signals.animationAdded.connect(self._on_animation_added)
-        self.collection.signals.animationRemoved.connect(self._on_animation_removed)
-        self.collection.signals.collectionLoaded.connect(self._on_collection_loaded)
+        signals = self.collection.signals
+        self.bridge = SignalBridge(self)
+        self.bridge.connect(signals.animationAdded, self._on_animation_added)
+        self.bridge.connect(signals.animationRemoved, self._on_animation_removed)
+        self.bridge.connect(signals.collectionLoaded, self._on_collection_loaded)
 
         # Initialize data
         self._refresh_animations_list()
@@ -91,12 +94,13 @@ class AnimationListModel(QAbstractListModel):
         if role == Qt.UserRole:
             id = self.animations[index.row()]
 
-            # Change name on all frames
+            # Change name on all frames, views refresh once at the end
             anim = self.collection.get_animation(id)
-            for i, frame in enumerate(anim.frames):
-                anim.update_frame(frame.id, name=f"{value.upper()} {i}")
+            with self.collection.batch():
+                for i, frame in enumerate(anim.frames):
+                    anim.update_frame(frame.id, name=f"{value.upper()} {i}")
 
-            self.collection.update_animation(id, name=value)
+                self.collection.update_animation(id, name=value)
             self.dataChanged.emit(index, index)
             return True
 
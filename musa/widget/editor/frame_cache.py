@@ -0,0 +1,108 @@
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from PyQt5.QtCore import QPoint, QRect, Qt
+from PyQt5.QtGui import QImage, QPainter, QPixmap
+
+from musa.model.frame import Frame
+from musa.widget.editor.pixmap_bank import PixmapBank
+
+
+class Composite(NamedTuple):
+    revision: int
+    pixmap: QPixmap
+    origin: QPoint  # scene position of the top left corner
+    bank_size: Optional[int]  # pixmaps known when a sprite image was missing
+
+
+class FrameCompositeCache:
+    """Frames rendered once into a single image, least recently used first out.
+
+    Entries are kept by frame id along with the frame revision they were
+    rendered from, so any edit of the frame, alpha included, invalidates exactly
+    its own entry.
+    """
+
+    def __init__(self, pixmaps: PixmapBank, budget: int = 64 * 1024 * 1024):
+        self.pixmaps = pixmaps
+        self.budget = budget
+        self.size = 0
+        self._entries: "OrderedDict[UUID, Composite]" = OrderedDict()
+
+    def get(self, frame: Frame) -> Composite:
+        entry = self._entries.get(frame.id)
+        if entry is not None and self._is_current(entry, frame):
+            self._entries.move_to_end(frame.id)
+            return entry
+
+        if entry is not None:
+            self._discard(frame.id)
+
+        entry = self._render(frame)
+        self._entries[frame.id] = entry
+        self.size += self._cost(entry)
+        while self.size > self.budget and len(self._entries) > 1:
+            self._discard(next(iter(self._entries)))
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def _is_current(self, entry: Composite, frame: Frame) -> bool:
+        # Sprites drawn without an image get it once it's added to the bank
+        return entry.revision == frame.revision and entry.bank_size in (
+            None,
+            len(self.pixmaps),
+        )
+
+    def _discard(self, frame_id: UUID):
+        self.size -= self._cost(self._entries.pop(frame_id))
+
+    @staticmethod
+    def _cost(entry: Composite) -> int:
+        return entry.pixmap.width() * entry.pixmap.height() * 4
+
+    def _render(self, frame: Frame) -> Composite:
+        missing = False
+        placed = []
+        for sprite in frame.sprites:
+            pixmap = self.pixmaps.get(sprite.sprite_index)
+            if pixmap is None:
+                missing = True
+            elif sprite.visible:
+                rect = QRect(sprite.x, sprite.y, pixmap.width(), pixmap.height())
+                placed.append(
+                    (rect, pixmap, sprite.h_flip, sprite.v_flip, sprite.opacity)
+                )
+
+        bounds = QRect()
+        for rect, *_ in placed:
+            bounds = bounds.united(rect)
+
+        image = QImage(bounds.size(), QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        if placed:
+            painter = QPainter(image)
+            painter.translate(-bounds.topLeft())
+
+            # Sprites are ordered by z from the top, paint from the bottom up
+            for rect, pixmap, h_flip, v_flip, opacity in reversed(placed):
+                painter.save()
+                painter.setOpacity(opacity)
+                painter.translate(
+                    rect.x() + (rect.width() if h_flip else 0),
+                    rect.y() + (rect.height() if v_flip else 0),
+                )
+                painter.scale(-1 if h_flip else 1, -1 if v_flip else 1)
+                painter.drawPixmap(0, 0, pixmap)
+                painter.restore()
+            painter.end()
+
+        return Composite(
+            frame.revision,
+            QPixmap.fromImage(image),
+            bounds.topLeft(),
+            len(self.pixmaps) if missing else None,
+        )
@@ -1,5 +1,5 @@
 from PyQt5.QtCore import QLineF, QPointF, QRectF, QSize, Qt
-from PyQt5.QtGui import QBrush, QColor, QPainter, QPen
+from PyQt5.QtGui import QBrush, QColor, QPainter, QPen, QPixmap
 from PyQt5.QtWidgets import QGraphicsView
 
 
@@ -13,23 +13,23 @@ class EditorGrid:
         self.view = view
         self.frame_size = QSize(256, 224)
         self.grid_size = size
+        self.checker = self._checker_brush(size)
         self.view.drawForeground = self.drawForeground
         self.view.drawBackground = self.drawBackground
 
-    def drawBackground(self, painter: QPainter, rect: QRectF) -> None:
-        painter.setPen(QPen(Qt.NoPen))
-
-        left = int(rect.left() - rect.left() % self.grid_size)
-        top = int(rect.top() - rect.top() % self.grid_size)
-
-        for y in range(top, int(rect.bottom()), self.grid_size):
-            for x in range(left, int(rect.right()), self.grid_size):
-                is_dark = (x / self.grid_size + y / self.grid_size) % 2
+    def _checker_brush(self, size: int) -> QBrush:
+        # Two by two cells, tiled from the scene origin by the brush
+        tile = QPixmap(size * 2, size * 2)
+        tile.fill(self.__lightColor)
+        painter = QPainter(tile)
+        painter.fillRect(size, 0, size, size, self.__darkColor)
+        painter.fillRect(0, size, size, size, self.__darkColor)
+        painter.end()
+        return QBrush(tile)
 
-                color = self.__darkColor if is_dark else self.__lightColor
-                painter.fillRect(
-                    QRectF(x, y, self.grid_size, self.grid_size), QBrush(color)
-                )
+    def drawBackground(self, painter: QPainter, rect: QRectF) -> None:
+        # One fill whatever the zoom, the texture follows the view transform
+        painter.fillRect(rect, self.checker)
 
         l = rect.left()
         r = rect.right()
@@ -43,8 +43,6 @@ class EditorGrid:
         pen.setCosmetic(True)
         painter.setPen(pen)
         painter.drawLines(*lines)
-        pen.setColor(self.__foreGridColor)
-        painter.setPen(pen)
 
     def drawForeground(self, painter: QPainter, rect) -> None:
         start = 6
@@ -1,9 +1,12 @@
+from typing import Optional
 from uuid import UUID
 
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtGui import QPixmap, QTransform
 from PyQt5.QtWidgets import QGraphicsPixmapItem
 
+from musa.model.sprite import Sprite
+
 
 class SpriteItem(QGraphicsPixmapItem):
     def __init__(self, pixmap: QPixmap, sprite_id: UUID, parent=None):
@@ -12,16 +15,39 @@ class SpriteItem(QGraphicsPixmapItem):
 
         self.setFlag(QGraphicsPixmapItem.ItemIsMovable)
         self.setFlag(QGraphicsPixmapItem.ItemIsSelectable)
+        self.setFlag(QGraphicsPixmapItem.ItemSendsGeometryChanges)
 
     def update_model(self):
-        # Change x,y
-        pass
-
-    def update_from_model(self):
-        pass
+        # Every step of a drag lands here, the history merges them into one edit
+        if scene := self.scene():
+            scene.sprite_moved(self)
+
+    def update_from_model(self, sprite: Sprite, pixmap: Optional[QPixmap]):
+        self.sprite_id = sprite.id
+        if pixmap is not None and pixmap.cacheKey() != self.pixmap().cacheKey():
+            self.setPixmap(pixmap)
+
+        self.setPos(sprite.x, sprite.y)
+        self.setZValue(sprite.z_index)
+        self.setOpacity(sprite.opacity)
+        self.setVisible(sprite.visible and pixmap is not None)
+
+        # Mirror in place, keeping the top left corner where it is
+        width, height = self.pixmap().width(), self.pixmap().height()
+        self.setTransform(
+            QTransform(
+                -1 if sprite.h_flip else 1,
+                0,
+                0,
+                -1 if sprite.v_flip else 1,
+                width if sprite.h_flip else 0,
+                height if sprite.v_flip else 0,
+            )
+        )
 
     def itemChange(self, change, value):
-        self.update_model()
+        if change == QGraphicsPixmapItem.ItemPositionHasChanged:
+            self.update_model()
         return super().itemChange(change, value)
 
     def mouseReleaseEvent(self, event):
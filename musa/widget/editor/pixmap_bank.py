@@ -0,0 +1,45 @@
+from typing import Dict, Optional
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QImage, QPixmap
+
+from musa.model.sprite_bank import SpriteBank
+
+
+class PixmapBank:
+    """Pixmaps of the sprite bank of a project, decoded when first shown.
+
+    Images are looked up by sprite index, an index the bank doesn't have yet,
+    like while a journal is replayed, resolves once the image is added.
+    """
+
+    def __init__(self, bank: Optional[SpriteBank] = None):
+        self.bank = bank if bank is not None else SpriteBank()
+        self._pixmaps: Dict[int, QPixmap] = {}
+
+    def set_bank(self, bank: SpriteBank):
+        self.bank = bank
+        self._pixmaps.clear()
+
+    def get(self, index: int) -> Optional[QPixmap]:
+        pixmap = self._pixmaps.get(index)
+        if pixmap is None and 0 <= index < len(self.bank):
+            pixmap = QPixmap()
+            pixmap.loadFromData(self.bank[index], "PNG")
+            self._pixmaps[index] = pixmap
+        return pixmap
+
+    def register(self, image: QImage) -> int:
+        """Sprite index of an image, equal images share the same index"""
+        image = image.convertToFormat(QImage.Format_ARGB32)
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, "PNG")
+
+        index = self.bank.add(bytes(data))
+        self._pixmaps.setdefault(index, QPixmap.fromImage(image))
+        return index
+
+    def __len__(self) -> int:
+        return len(self.bank)
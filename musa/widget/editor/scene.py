@@ -1,31 +1,182 @@
+from typing import Dict, List, Optional
+from uuid import UUID
+
 from PyQt5.QtCore import QPoint, Qt
 from PyQt5.QtGui import QImage, QPixmap
-from PyQt5.QtWidgets import QGraphicsScene
+from PyQt5.QtWidgets import QGraphicsPixmapItem, QGraphicsScene
 
 from musa.model.animation import Animation
 from musa.model.frame import Frame
 from musa.model.sprite import Sprite
+from musa.model.sprite_bank import SpriteBank
+from musa.model_adapter.signal_bridge import SignalBridge
+from musa.widget.editor.frame_cache import FrameCompositeCache
 from musa.widget.editor.item import SpriteItem
+from musa.widget.editor.pixmap_bank import PixmapBank
 
 
 class EditorScene(QGraphicsScene):
     _SIZE = 256
 
+    # Mime data of a dragged sprite holding its h and v flips, one byte each
+    FLIP_MIME_TYPE = "application/x-musa-sprite-flip"
+
+    # Opacity of the nearest ghost frame, each one further away is fainter
+    ONION_OPACITY = 0.4
+    ONION_DECAY = 0.5
+    GHOST_Z = -1000
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setSceneRect(-self._SIZE / 2, -self._SIZE / 2, self._SIZE, self._SIZE)
         self.connections()
 
         self.scratch_pad_frame = Frame()
+        self._scratch_items: Dict[UUID, SpriteItem] = {}
         self.current_frame: Frame = None
         self.current_animation: Animation = None
 
+        # Sprite images by sprite index, kept in the sprite bank of the project
+        self.pixmaps = PixmapBank()
+
+        # Items showing the current frame, reused from one frame to the next
+        self._frame_items: List[SpriteItem] = []
+        self._syncing = False
+
+        # Whole frames rendered once, shown instead of the items during playback
+        self.composites = FrameCompositeCache(self.pixmaps)
+        self._composite_item = QGraphicsPixmapItem()
+        self._composite_item.setVisible(False)
+        self.addItem(self._composite_item)
+
+        # Neighbouring frames drawn faintly behind the current one
+        self.onion_before = 0
+        self.onion_after = 0
+        self._ghost_items: List[QGraphicsPixmapItem] = []
+        self.bridge = SignalBridge(self)
+
     def set_frame(self, frame: Frame):
         self.current_frame = frame
+        self.show_frame(frame)
+        self.update_onion_skin()
+
+    def refresh(self):
+        """Bring the items back in line with the model, like after an undo"""
+        # During playback the next composite is rendered from the new revision
+        if not self._composite_item.isVisible():
+            self.show_frame(self.current_frame)
+            self.update_onion_skin()
+        self._sync_scratch_pad()
+
+    def set_onion_skin(self, before: int, after: int):
+        self.onion_before = before
+        self.onion_after = after
+        self.update_onion_skin()
+
+    def update_onion_skin(self):
+        """Place the ghost frames around the current one, renders come cached"""
+        ghosts = []
+        animation, frame = self.current_animation, self.current_frame
+        row = animation.frame_row(frame.id) if animation and frame else None
+        if row is not None and not self._composite_item.isVisible():
+            for distance in range(1, max(self.onion_before, self.onion_after) + 1):
+                if distance <= self.onion_before and row - distance >= 0:
+                    ghosts.append((animation.frames[row - distance], distance))
+                if distance <= self.onion_after and row + distance < len(
+                    animation.frames
+                ):
+                    ghosts.append((animation.frames[row + distance], distance))
+
+        while len(self._ghost_items) < len(ghosts):
+            item = QGraphicsPixmapItem()
+            item.setAcceptedMouseButtons(Qt.NoButton)
+            self.addItem(item)
+            self._ghost_items.append(item)
+
+        for item, (ghost, distance) in zip(self._ghost_items, ghosts):
+            composite = self.composites.get(ghost)
+            item.setPixmap(composite.pixmap)
+            item.setPos(composite.origin)
+            item.setOpacity(self.ONION_OPACITY * self.ONION_DECAY ** (distance - 1))
+            item.setZValue(self.GHOST_Z - distance)
+            item.setVisible(True)
+
+        for item in self._ghost_items[len(ghosts) :]:
+            item.setVisible(False)
+
+    def show_composite(self, frame: Frame):
+        """Show a frame as a single cached image, its sprites can't be edited"""
+        self.current_frame = frame
+        composite = self.composites.get(frame)
+
+        self._composite_item.setPixmap(composite.pixmap)
+        self._composite_item.setPos(composite.origin)
+        self._composite_item.setVisible(True)
+        for item in self._frame_items + self._ghost_items:
+            item.setVisible(False)
+
+    def show_frame(self, frame: Optional[Frame]):
+        """Show the sprites of a frame, moving the existing items into place"""
+        sprites = frame.sprites if frame else []
+        self._composite_item.setVisible(False)
+
+        # Items follow the model here, they must not write back to it
+        self._syncing = True
+        try:
+            for row, sprite in enumerate(sprites):
+                if row == len(self._frame_items):
+                    item = SpriteItem(QPixmap(), sprite.id)
+                    self.addItem(item)
+                    self._frame_items.append(item)
+                self._frame_items[row].update_from_model(
+                    sprite, self.pixmaps.get(sprite.sprite_index)
+                )
+
+            for item in self._frame_items[len(sprites) :]:
+                item.setVisible(False)
+        finally:
+            self._syncing = False
+
+    def _sync_scratch_pad(self):
+        sprites = {sprite.id: sprite for sprite in self.scratch_pad_frame.sprites}
+        for sprite_id in self._scratch_items.keys() - sprites.keys():
+            self.removeItem(self._scratch_items.pop(sprite_id))
+
+        self._syncing = True
+        try:
+            for sprite_id, sprite in sprites.items():
+                if (item := self._scratch_items.get(sprite_id)) is None:
+                    item = SpriteItem(QPixmap(), sprite_id)
+                    self.addItem(item)
+                    self._scratch_items[sprite_id] = item
+                item.update_from_model(sprite, self.pixmaps.get(sprite.sprite_index))
+        finally:
+            self._syncing = False
+
+    def set_sprite_bank(self, bank: SpriteBank):
+        self.pixmaps.set_bank(bank)
+        self.composites.clear()
+        self.refresh()
+
+    def register_pixmap(self, image: QImage) -> int:
+        """Sprite index of an image, equal images share the same index"""
+        return self.pixmaps.register(image)
 
     def set_animation(self, animation: Animation):
         self.current_animation = animation
 
+        # Ghosts follow the frames around the current one
+        self.bridge.disconnect_all()
+        if animation:
+            signals = animation.signals
+            for signal in (
+                signals.frameAdded,
+                signals.frameRemoved,
+                signals.frameModified,
+                signals.animationModified,
+            ):
+                self.bridge.connect(signal, lambda *args: self.update_onion_skin())
+
     def connections(self):
         self.selectionChanged.connect(self._on_selection_changed)
 
@@ -49,15 +200,32 @@ class EditorScene(QGraphicsScene):
             offset_y = image.size().height() // 2
 
             pos = pos - QPoint(offset_x, offset_y)
-            sprite = Sprite(x=pos.x(), y=pos.y())
-
-            item = SpriteItem(QPixmap.fromImage(image), sprite.id)
-            item.setPos(pos)
-
-            self.addItem(item)
+            h_flip, v_flip = bytes(event.mimeData().data(self.FLIP_MIME_TYPE)) or (0, 0)
+            sprite = Sprite(
+                x=round(pos.x()),
+                y=round(pos.y()),
+                h_flip=bool(h_flip),
+                v_flip=bool(v_flip),
+                sprite_index=self.register_pixmap(image),
+            )
             self.scratch_pad_frame.add_sprite(sprite)
+            self._sync_scratch_pad()
 
             event.acceptProposedAction()
 
+    def frame_of(self, sprite_id) -> Frame:
+        if self.current_frame and self.current_frame.get_sprite(sprite_id):
+            return self.current_frame
+        return self.scratch_pad_frame
+
+    def sprite_moved(self, item: SpriteItem):
+        if self._syncing:
+            return
+
+        pos = item.pos()
+        self.frame_of(item.sprite_id).update_sprite(
+            item.sprite_id, x=round(pos.x()), y=round(pos.y())
+        )
+
     def _on_selection_changed(self):
         pass
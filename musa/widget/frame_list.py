@@ -1,4 +1,4 @@
-from typing import Any, List, Optional
+from typing import Any, List
 from uuid import UUID
 
 from PyQt5.QtCore import (
@@ -24,6 +24,7 @@ from musa.manager import ResourceManager
 from musa.model.animation import Animation
 from musa.model.frame import Frame
 from musa.model.sprite import Sprite
+from musa.model_adapter.signal_bridge import SignalBridge
 from musa.widget.button import IconButton
 
 
@@ -32,6 +33,7 @@ class FrameListModel(QAbstractListModel):
         super().__init__(parent)
         self.animation = animation
         self.frames: List[UUID] = []
+        self.bridge = SignalBridge(self)
 
     def _refresh_frame_list(self):
         self.frames = [f.id for f in self.animation.frames]
@@ -78,38 +80,42 @@ class FrameListModel(QAbstractListModel):
         self.animation = animation
         self._refresh_frame_list()
 
-        # connect to animation signals
-        self.animation.signals.frameAdded.connect(self._on_frame_changed)
-        self.animation.signals.frameRemoved.connect(self._on_frame_changed)
-        self.animation.signals.frameModified.connect(self._on_frame_modified)
-        self.animation.signals.animationModified.connect(self._on_animation_modified)
+        # connect to animation signals, dropping the previous animation's
+        self.bridge.disconnect_all()
+        signals = self.animation.signals
+        self.bridge.connect(signals.frameAdded, self._on_frame_added)
+        self.bridge.connect(signals.frameRemoved, self._on_frame_removed)
+        self.bridge.connect(signals.frameModified, self._on_frame_modified)
+        self.bridge.connect(signals.animationModified, self._on_animation_modified)
 
         self.endResetModel()
 
-    def _on_frame_changed(self, animation_id: UUID, frame_id: Optional[UUID] = None):
+    def _on_frame_added(self, animation_id: UUID, frame_id: UUID, row: int):
         if animation_id == self.animation.id:
-            self.beginResetModel()
-            self._refresh_frame_list()
-            self.endResetModel()
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.frames.insert(row, frame_id)
+            self.endInsertRows()
+
+    def _on_frame_removed(self, animation_id: UUID, frame_id: UUID, row: int):
+        if animation_id == self.animation.id:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.frames[row]
+            self.endRemoveRows()
 
     def _on_frame_modified(self, animation_id: UUID, frame_id: UUID):
         if animation_id == self.animation.id:
-            try:
-                row = next(
-                    i
-                    for i, frame in enumerate(self.animation.frames)
-                    if frame.id == frame_id
-                )
+            # Signals held back by a batch may arrive before the rows settle
+            row = self.animation.frame_row(frame_id)
+            if row is None or row >= len(self.frames) or self.frames[row] != frame_id:
+                row = self.frames.index(frame_id) if frame_id in self.frames else None
+
+            if row is not None:
                 index = self.index(row, 0)
                 self.dataChanged.emit(index, index)
-            except StopIteration:
-                pass
 
     def _on_animation_modified(self, animation_id: UUID):
-        if animation_id == self.animation.id:
-            self.beginResetModel()
-            self._refresh_frame_list()
-            self.endResetModel()
+        if animation_id == self.animation.id and self.frames:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.frames) - 1, 0))
 
 
 class FrameItemDelegate(QStyledItemDelegate):
@@ -219,11 +225,15 @@ class FrameListWidget(QWidget):
         index = len(self.animation.frames)
         dummy = Frame(name=f"{base_name.upper()} {index}")
 
-        dummy.add_sprite(Sprite(name="HAND_0", z_index=0))
-        dummy.add_sprite(Sprite(name="LEG_1", z_index=1))
-        dummy.add_sprite(Sprite(name="HEAD_4", z_index=2))
-        dummy.add_sprite(Sprite(name="TORSO_3", z_index=3))
-        dummy.add_sprite(Sprite(name="FOOT_2", z_index=4))
+        dummy.add_sprites(
+            [
+                Sprite(name="HAND_0", z_index=0),
+                Sprite(name="LEG_1", z_index=1),
+                Sprite(name="HEAD_4", z_index=2),
+                Sprite(name="TORSO_3", z_index=3),
+                Sprite(name="FOOT_2", z_index=4),
+            ]
+        )
 
         self.animation.add_frame(dummy)
 
@@ -1,14 +1,15 @@
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 
 from PyQt5.QtCore import QMimeData, QPoint, Qt
-from PyQt5.QtGui import QDrag, QPixmap
+from PyQt5.QtGui import QDrag, QPixmap, QTransform
 from PyQt5.QtWidgets import (
     QAction,
     QFileDialog,
     QFrame,
     QHBoxLayout,
     QLabel,
+    QProgressDialog,
     QPushButton,
     QScrollArea,
     QToolBar,
@@ -17,13 +18,23 @@ from PyQt5.QtWidgets import (
 )
 
 from musa.dialog import FileDialogFactory, SpriteSheetDialog
+from musa.util.sprite_extractor import SpriteExtractor
+from musa.util.sprite_index import SpriteMatch
+from musa.widget.editor import EditorScene
 
 
 class DragableSpriteLabel(QLabel):
-    def __init__(self, pixmap, parent=None):
+    def __init__(self, pixmap, h_flip: bool = False, v_flip: bool = False, parent=None):
         super().__init__(parent)
+        # Mirrored sprites drag the canonical pixmap and the flips to apply
         self.sprite_pixmap = pixmap
-        self.setPixmap(pixmap.scaled(64, 64, Qt.KeepAspectRatio, Qt.FastTransformation))
+        self.h_flip = h_flip
+        self.v_flip = v_flip
+
+        shown = pixmap.transformed(
+            QTransform.fromScale(-1 if h_flip else 1, -1 if v_flip else 1)
+        )
+        self.setPixmap(shown.scaled(64, 64, Qt.KeepAspectRatio, Qt.FastTransformation))
         self.setFixedSize(64, 64)
         self.setFrameStyle(QFrame.Box)
 
@@ -32,8 +43,11 @@ class DragableSpriteLabel(QLabel):
             drag = QDrag(self)
             mime_data = QMimeData()
             mime_data.setImageData(self.sprite_pixmap.toImage())
+            mime_data.setData(
+                EditorScene.FLIP_MIME_TYPE, bytes([self.h_flip, self.v_flip])
+            )
             drag.setMimeData(mime_data)
-            drag.setPixmap(self.sprite_pixmap.scaled(32, 32, Qt.KeepAspectRatio))
+            drag.setPixmap(self.pixmap().scaled(32, 32, Qt.KeepAspectRatio))
             drag.setHotSpot(QPoint(16, 16))
             drag.exec_()
 
@@ -69,11 +83,30 @@ class SpritePaletteWidget(QWidget):
     def add_sprite_sheet(self):
         file = FileDialogFactory.open_image()
         if file:
-            extractor = SpriteSheetDialog(file, self)
-            if extractor.exec_() == QFileDialog.Accepted:
-                self.load_sprites(file, extractor.get_sprites())
-
-    def load_sprites(self, file: Path, sprites: List[QPixmap]):
+            dialog = SpriteSheetDialog(file, self)
+            if dialog.exec_() == QFileDialog.Accepted:
+                self.extract_sprites(file, dialog.create_extractor(self))
+
+    def extract_sprites(self, file: Path, extractor: SpriteExtractor):
+        """Fill a new sheet column with the sprites as the extractor streams them"""
+        self.load_sprites(file, [])
+
+        progress = QProgressDialog(
+            f"Extracting {file.name}...", "Cancel", 0, extractor.total, self
+        )
+        progress.setWindowModality(Qt.NonModal)
+        progress.setMinimumDuration(500)
+        progress.canceled.connect(extractor.cancel)
+
+        extractor.spritesExtracted.connect(
+            lambda sprites: self.append_sprites(file, sprites)
+        )
+        extractor.progressChanged.connect(lambda done, total: progress.setValue(done))
+        extractor.finished.connect(progress.deleteLater)
+        extractor.finished.connect(extractor.deleteLater)
+        extractor.start()
+
+    def load_sprites(self, file: Path, sprites: List[Tuple[QPixmap, SpriteMatch]]):
         sheet_widget = QWidget()
         sheet_layout = QVBoxLayout(sheet_widget)
         sheet_layout.addWidget(QLabel(file.name))
@@ -87,16 +120,23 @@ class SpritePaletteWidget(QWidget):
         column_scroll.setWidget(sprite_column)
         column_scroll.setWidgetResizable(True)
 
-        sprite_list = []
-        for sprite_pixmap in sprites:
-            sprite_label = DragableSpriteLabel(sprite_pixmap)
-            column_layout.addWidget(sprite_label)
-            sprite_list.append(sprite_label)
-
         column_layout.addStretch()
         sheet_layout.addWidget(column_scroll)
         self.row_layout.addWidget(sheet_widget)
-        self.sprite_sheets[file.name] = (sheet_widget, sprite_list)
+        self.sprite_sheets[file.name] = (sheet_widget, column_layout, [])
+
+        self.append_sprites(file, sprites)
+
+    def append_sprites(self, file: Path, sprites: List[Tuple[QPixmap, SpriteMatch]]):
+        _, column_layout, sprite_list = self.sprite_sheets[file.name]
+
+        for sprite_pixmap, match in sprites:
+            sprite_label = DragableSpriteLabel(
+                sprite_pixmap, match.h_flip, match.v_flip
+            )
+            # Keep the stretch at the bottom of the column
+            column_layout.insertWidget(column_layout.count() - 1, sprite_label)
+            sprite_list.append(sprite_label)
 
     def remove_sprite_sheet(self):
         pass
@@ -1,8 +1,20 @@
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtWidgets import QFrame, QHBoxLayout, QLabel, QPushButton, QSpinBox, QWidget
+from PyQt5.QtWidgets import (
+    QComboBox,
+    QFrame,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSpinBox,
+    QWidget,
+)
+
+from musa.manager.playback import PlaybackEngine, PlaybackRate
 
 
 class PlayBackWidget(QWidget):
+    rateChanged = pyqtSignal(PlaybackRate, int)  # rate, custom fps
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -12,11 +24,20 @@ class PlayBackWidget(QWidget):
         self.prev_btn = QPushButton("<")
         self.next_btn = QPushButton(">")
 
+        self.rate_combo = QComboBox()
+        self.rate_combo.addItem("Custom", PlaybackRate.CUSTOM)
+        self.rate_combo.addItem("NTSC 60Hz", PlaybackRate.NTSC)
+        self.rate_combo.addItem("PAL 50Hz", PlaybackRate.PAL)
+
         self.fps_label = QLabel("Fps:")
         self.fps_spin = QSpinBox()
         self.fps_spin.setRange(1, 60)
         self.fps_spin.setValue(16)
 
+        self.achieved_label = QLabel()
+        self.achieved_label.setMinimumWidth(60)
+        self.achieved_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
         container = QFrame()
         container.setFrameStyle(QFrame.StyledPanel)
         control_layout = QHBoxLayout()
@@ -24,8 +45,10 @@ class PlayBackWidget(QWidget):
         control_layout.addWidget(self.stop_btn)
         control_layout.addWidget(self.play_btn)
         control_layout.addWidget(self.next_btn)
+        control_layout.addWidget(self.rate_combo)
         control_layout.addWidget(self.fps_label)
         control_layout.addWidget(self.fps_spin)
+        control_layout.addWidget(self.achieved_label)
         container.setLayout(control_layout)
 
         layout = QHBoxLayout()
@@ -33,3 +56,41 @@ class PlayBackWidget(QWidget):
         layout.addWidget(container)
         layout.addStretch(2)
         self.setLayout(layout)
+
+        self.rate_combo.currentIndexChanged.connect(self._on_rate_changed)
+        self.fps_spin.valueChanged.connect(self._on_rate_changed)
+
+    def connect_engine(self, engine: PlaybackEngine):
+        self.engine = engine
+        self.play_btn.toggled.connect(self._on_play_toggled)
+        self.stop_btn.clicked.connect(engine.stop)
+        self.prev_btn.clicked.connect(lambda: engine.step(-1))
+        self.next_btn.clicked.connect(lambda: engine.step(1))
+        self.rateChanged.connect(engine.set_rate)
+
+        engine.playingChanged.connect(self._on_playing_changed)
+        engine.fpsMeasured.connect(
+            lambda fps: self.achieved_label.setText(f"{fps:.1f} fps")
+        )
+        engine.set_rate(self.rate_combo.currentData(), self.fps_spin.value())
+
+    def _on_play_toggled(self, checked: bool):
+        if checked:
+            self.engine.play()
+        else:
+            self.engine.pause()
+
+        # Nothing to play leaves the engine stopped
+        self._on_playing_changed(self.engine.is_playing())
+
+    def _on_rate_changed(self):
+        rate = self.rate_combo.currentData()
+        self.fps_spin.setEnabled(rate == PlaybackRate.CUSTOM)
+        self.rateChanged.emit(rate, self.fps_spin.value())
+
+    def _on_playing_changed(self, playing: bool):
+        # Playback can also stop on its own, like when the animation is emptied
+        self.play_btn.setChecked(playing)
+        self.play_btn.setText("Pause" if playing else "Play")
+        if not playing:
+            self.achieved_label.clear()
@@ -8,6 +8,7 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from musa.model.frame import Frame
 from musa.model.sprite import Sprite
 from musa.widget.slider import ValueSlider
 
@@ -17,6 +18,7 @@ class SpriteInspector(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.current_frame: Frame = None
         self.current_sprite: Sprite = None
 
         self.setup_ui()
@@ -31,19 +33,27 @@ class SpriteInspector(QWidget):
         self.alpha_slider.valueChanged.connect(self._on_opacity_changed)
 
     def _on_x_changed(self, value: int):
-        self.current_sprite.x = value
+        self._update_sprite("x", value)
 
     def _on_y_changed(self, value: int):
-        self.current_sprite.y = value
+        self._update_sprite("y", value)
 
     def _on_hflip_changed(self, value: int):
-        self.current_sprite.h_flip = value == Qt.Checked
+        self._update_sprite("h_flip", value == Qt.Checked)
 
     def _on_vflip_changed(self, value: int):
-        self.current_sprite.v_flip = value == Qt.Checked
+        self._update_sprite("v_flip", value == Qt.Checked)
 
     def _on_opacity_changed(self, value: int):
-        self.current_sprite.alpha = value
+        self._update_sprite("alpha", value)
+
+    def _update_sprite(self, key: str, value):
+        # Go through the frame so the change is tracked for saving
+        if self.current_frame:
+            self.current_frame.update_sprite(self.current_sprite.id, **{key: value})
+        else:
+            setattr(self.current_sprite, key, value)
+        self.propertyChanged.emit(key, value)
 
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -79,6 +89,10 @@ class SpriteInspector(QWidget):
         layout.addLayout(form)
         self.setLayout(layout)
 
+    def set_frame(self, frame: Frame):
+        self.current_frame = frame
+        self.set_sprite(None)
+
     def set_sprite(self, sprite: Sprite):
         self.current_sprite = sprite
 
@@ -23,7 +23,6 @@ from PyQt5.QtWidgets import (
 
 from musa.manager import ResourceManager
 from musa.model.frame import Frame
-from musa.model.sprite import Sprite
 from musa.widget.button import IconButton
 
 
@@ -60,7 +59,7 @@ class SpriteListModel(QAbstractListModel):
 
         if role == Qt.UserRole:  # For visibility updates
             id = self.sprites[index.row()]
-            self.frame.get_sprite(id).visible = value
+            self.frame.update_sprite(id, visible=value)
 
             self.dataChanged.emit(index, index, [role])
             return True
@@ -68,11 +67,26 @@ class SpriteListModel(QAbstractListModel):
         return False
 
     def move_sprite(self, from_index: int, to_index: int):
-        self.frame.move_sprite(self.sprites[from_index], self.sprites[to_index])
+        sprite_id = self.sprites[from_index]
+        self.frame.move_sprite(sprite_id, self.sprites[to_index])
 
-        self.beginResetModel()
-        self._refresh_sprite_list()
-        self.endResetModel()
+        # Swapping the z index of two neighbours just swaps their rows
+        row = self.frame.sprite_row(sprite_id)
+        if row == from_index:
+            return
+        if row != to_index or abs(to_index - from_index) != 1:
+            self.beginResetModel()
+            self._refresh_sprite_list()
+            self.endResetModel()
+            return
+
+        first = min(from_index, to_index)
+        self.beginMoveRows(QModelIndex(), first, first, QModelIndex(), first + 2)
+        self.sprites[first], self.sprites[first + 1] = (
+            self.sprites[first + 1],
+            self.sprites[first],
+        )
+        self.endMoveRows()
 
     def set_current_frame(self, frame: Frame):
         self.beginResetModel()
@@ -80,6 +94,10 @@ class SpriteListModel(QAbstractListModel):
         self._refresh_sprite_list()
         self.endResetModel()
 
+    def refresh(self):
+        """Reload the sprites of the frame, it has no signals to follow"""
+        self.set_current_frame(self.frame)
+
 
 class SpriteItemDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
@@ -133,7 +151,7 @@ class SpriteItemDelegate(QStyledItemDelegate):
 
 
 class SpriteListWidget(QWidget):
-    spriteSelected = pyqtSignal(Sprite)
+    spriteSelected = pyqtSignal(object)  # Sprite, None when nothing is selected
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -190,6 +208,23 @@ class SpriteListWidget(QWidget):
         self.frame = frame
         self.sprite_model.set_current_frame(self.frame)
 
+    def refresh(self):
+        """Reload the sprites, keeping the current one selected if it's still there"""
+        if self.frame is None:
+            return
+
+        current = self.list.currentIndex()
+        sprite_id = (
+            self.sprite_model.sprites[current.row()] if current.isValid() else None
+        )
+        self.sprite_model.refresh()
+
+        row = self.frame.sprite_row(sprite_id) if sprite_id else None
+        if row is not None:
+            self.list.setCurrentIndex(self.sprite_model.index(row, 0))
+        else:
+            self._on_sprite_selected(QModelIndex())
+
     def _on_sprite_selected(self, current: QItemSelectionModel):
         self._update_buttons(current)
 
@@ -1,6 +1,12 @@
-from PyQt5.QtCore import QPoint, QPointF, QRect, Qt, pyqtSignal
-from PyQt5.QtGui import QColor, QFont, QPainter, QPainterPath, QPen, QPixmap, QTransform
-from PyQt5.QtWidgets import QGraphicsDropShadowEffect, QLabel, QScrollArea, QWidget
+from PyQt5.QtCore import QLineF, QPoint, QRect, QRectF, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QPainter, QPainterPath, QPen, QPixmap
+from PyQt5.QtWidgets import (
+    QGraphicsBlurEffect,
+    QGraphicsPixmapItem,
+    QGraphicsScene,
+    QScrollArea,
+    QWidget,
+)
 
 
 class Magnifier(QWidget):
@@ -16,6 +22,12 @@ class Magnifier(QWidget):
 
         self.source_pixmap: QPixmap = None
 
+        # Lens shape, crosshair and border never change, build them once
+        self.clip_path = QPainterPath()
+        self.clip_path.addEllipse(0, 0, self.lens_size, self.lens_size)
+        self.overlay = self._render_overlay()
+        self.label_font = QFont("Arial", 8)
+
         self.setFixedSize(self.lens_size, self.lens_size)
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.Tool | Qt.WindowStaysOnTopHint)
         self.setAttribute(Qt.WA_TranslucentBackground)
@@ -27,17 +39,48 @@ class Magnifier(QWidget):
         self.magnified_pos = pos
         self.update()
 
+    def _render_overlay(self) -> QPixmap:
+        overlay = QPixmap(self.lens_size, self.lens_size)
+        overlay.fill(Qt.transparent)
+
+        painter = QPainter(overlay)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setClipPath(self.clip_path)
+
+        # Draw Crosshair
+        center = self.lens_size // 2
+        lines = [
+            # Horizontal
+            QLineF(center - 10, center + 0.5, center + 10, center + 0.5),
+            # Vertical
+            QLineF(center + 0.5, center - 10, center + 0.5, center + 10),
+        ]
+
+        pen = QPen(Qt.black, 3)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.drawLines(lines)
+
+        pen = QPen(Qt.white, 1)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.drawLines(lines)
+
+        # Draw border
+        painter.setPen(QPen(Qt.black, 2))
+        painter.drawEllipse(0, 0, self.lens_size, self.lens_size)
+
+        painter.end()
+        return overlay
+
     def paintEvent(self, event):
         if not self.source_pixmap:
             return
 
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
-
-        # Create clipping path
-        path = QPainterPath()
-        path.addEllipse(0, 0, self.lens_size, self.lens_size)
-        painter.setClipPath(path)
+        painter.setClipPath(self.clip_path)
+        painter.fillRect(self.rect(), Qt.black)
 
         # Source Rectangle top-left x,y with center at mouse coords
         src_x = self.magnified_pos.x() - self.lens_rect_size // 2
@@ -63,52 +106,12 @@ class Magnifier(QWidget):
         # Destination rectangle in the lens widget at the correct offset and size
         dst_rect = QRect(lens_x_offset, lens_y_offset, src_width, src_height)
 
-        # Copy and scale the valid portion of the source pixmap
-        valid_src_rect
-        area = self.source_pixmap.copy(valid_src_rect).scaled(
-            self.lens_size, self.lens_size, Qt.KeepAspectRatio, Qt.FastTransformation
-        )
-
-        # Compose the final image
-        result = QPixmap(self.lens_size, self.lens_size)
-        result.fill(Qt.black)
-        pix = QPainter(result)
-        pix.drawPixmap(dst_rect, area)
-        pix.end()
-
-        painter.drawPixmap(0, 0, result)
-
-        # Draw Crosshair
-        center = self.lens_size // 2
-
-        pen = QPen(Qt.black, 3)
-        pen.setCosmetic(True)
-        painter.setPen(pen)
-
-        # Horizontal
-        painter.drawLine(
-            QPointF(center - 10, center + 0.5), QPointF(center + 10, center + 0.5)
-        )
-        # Vertical
-        painter.drawLine(
-            QPointF(center + 0.5, center - 10), QPointF(center + 0.5, center + 10)
-        )
-
-        pen = QPen(Qt.white, 1)
-        pen.setCosmetic(True)
-        painter.setPen(pen)
-
-        # Horizontal
-        painter.drawLine(
-            QPointF(center - 10, center + 0.5), QPointF(center + 10, center + 0.5)
-        )
-        # Vertical
-        painter.drawLine(
-            QPointF(center + 0.5, center - 10), QPointF(center + 0.5, center + 10)
-        )
+        # Scale the valid portion of the source straight into the lens
+        painter.drawPixmap(dst_rect, self.source_pixmap, valid_src_rect)
+        painter.drawPixmap(0, 0, self.overlay)
 
         # Draw coordinates
-        painter.setFont(QFont("Arial", 8))
+        painter.setFont(self.label_font)
         text = f"({self.magnified_pos.x()}, {self.magnified_pos.y()})"
 
         metrics = painter.fontMetrics()
@@ -130,18 +133,100 @@ class Magnifier(QWidget):
         painter.setPen(Qt.white)
         painter.drawText(text_x, text_y, text)
 
-        # Draw border
-        painter.setPen(QPen(Qt.black, 2))
-        painter.drawEllipse(0, 0, self.lens_size, self.lens_size)
 
+class DropShadow:
+    """Nine-patch drop shadow.
+
+    The blur is rendered once on a small patch, painting only stretches its
+    corners and edges around the target rect.
+    """
+
+    def __init__(
+        self,
+        blur_radius: int = 20,
+        color: QColor = QColor(0, 0, 0, 128),
+        offset: QPoint = QPoint(8, 8),
+    ):
+        self.blur_radius = blur_radius
+        self.offset = offset
+
+        # Space the shadow needs around the rect it follows
+        self.margin = blur_radius + max(abs(offset.x()), abs(offset.y()))
+
+        # Corners hold the whole fade, inside and outside the rect edge
+        self.corner = 2 * blur_radius
+        self.patch = self._render_patch(color)
+
+    def _render_patch(self, color: QColor) -> QPixmap:
+        radius = self.blur_radius
+        size = 2 * self.corner + 1
+
+        core = QPixmap(size - 2 * radius, size - 2 * radius)
+        core.fill(color)
+
+        item = QGraphicsPixmapItem(core)
+        item.setPos(radius, radius)
+        blur = QGraphicsBlurEffect()
+        blur.setBlurRadius(radius)
+        blur.setBlurHints(QGraphicsBlurEffect.QualityHint)
+        item.setGraphicsEffect(blur)
+
+        scene = QGraphicsScene(0, 0, size, size)
+        scene.addItem(item)
+
+        patch = QPixmap(size, size)
+        patch.fill(Qt.transparent)
+        with QPainter(patch) as painter:
+            scene.render(painter, QRectF(patch.rect()), scene.sceneRect())
+
+        return patch
+
+    def paint(self, painter: QPainter, rect: QRect):
+        """Paint the shadow of rect, the center is left for the rect itself"""
+        radius = self.blur_radius
+        target = rect.translated(self.offset).adjusted(-radius, -radius, radius, radius)
+
+        # Small rects share the corners
+        cw = min(self.corner, target.width() // 2)
+        ch = min(self.corner, target.height() // 2)
+        size = self.patch.width()
+        mid_w = target.width() - 2 * cw
+        mid_h = target.height() - 2 * ch
+
+        left, top = target.left(), target.top()
+        right, bottom = left + target.width() - cw, top + target.height() - ch
+        edge = self.corner  # Patch row and column stretched along the edges
+
+        pieces = [
+            # Corners
+            (QRect(left, top, cw, ch), QRect(0, 0, cw, ch)),
+            (QRect(right, top, cw, ch), QRect(size - cw, 0, cw, ch)),
+            (QRect(left, bottom, cw, ch), QRect(0, size - ch, cw, ch)),
+            (QRect(right, bottom, cw, ch), QRect(size - cw, size - ch, cw, ch)),
+            # Edges
+            (QRect(left + cw, top, mid_w, ch), QRect(edge, 0, 1, ch)),
+            (QRect(left + cw, bottom, mid_w, ch), QRect(edge, size - ch, 1, ch)),
+            (QRect(left, top + ch, cw, mid_h), QRect(0, edge, cw, 1)),
+            (QRect(right, top + ch, cw, mid_h), QRect(size - cw, edge, cw, 1)),
+        ]
+
+        for target_rect, source_rect in pieces:
+            if target_rect.isValid():
+                painter.drawPixmap(target_rect, self.patch, source_rect)
+
+
+class ImageViewer(QWidget):
+    """Zoomable image with an optional overlay.
+
+    Only the exposed part of the image is scaled and painted, so memory does not
+    grow with the zoom level.
+    """
 
-class ImageViewer(QLabel):
     clicked = pyqtSignal(object)
     zoomChanged = pyqtSignal(float)
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setAlignment(Qt.AlignCenter)
         self.can_click = False
 
         # Zoom parameters
@@ -150,8 +235,9 @@ class ImageViewer(QLabel):
         self.max_zoom = 12
         self.zoom_step = 0.1
 
-        # Original pixmap
+        # Original pixmap and overlay drawn on top, both at image size
         self.original_pixmap: QPixmap = None
+        self.overlay_pixmap: QPixmap = None
 
         # Magnifier setup
         self.magnifier = Magnifier(self)
@@ -160,13 +246,8 @@ class ImageViewer(QLabel):
         # Hover and zoom tracking
         self.setMouseTracking(True)
 
-        # Shadow fx
-        self.shadow = QGraphicsDropShadowEffect(self)
-        self.shadow.setBlurRadius(20)
-        self.shadow.setColor(QColor(0, 0, 0, 128))
-        self.shadow.setOffset(8, 8)
-        self.setGraphicsEffect(self.shadow)
-        self.shadow.setEnabled(True)
+        # Shadow fx, painted around the image inside the widget margins
+        self.shadow = DropShadow(20, QColor(0, 0, 0, 128), QPoint(8, 8))
 
     def toggle_click(self):
         self.can_click = not self.can_click
@@ -183,26 +264,52 @@ class ImageViewer(QLabel):
         if self.magnifier:
             self.magnifier.set_source_pixmap(pixmap)
 
+    def set_overlay(self, pixmap: QPixmap):
+        """Set the pixmap drawn over the original one, at the same size"""
+        self.overlay_pixmap = pixmap
+        self.update()
+
     def set_zoom(self, zoom_level: float):
         self.zoom_factor = max(self.min_zoom, min(self.max_zoom, zoom_level))
         self._update_displayed_pixmap()
 
     def _update_displayed_pixmap(self):
-        """Apply zoom and update pixmap"""
+        """Resize to the zoomed image, painting does the scaling"""
         if not self.original_pixmap:
             return
 
-        # Scale the pixmap
-        transform = QTransform()
-        transform.scale(self.zoom_factor, self.zoom_factor)
-
-        # Apply zoom
-        zoomed_pixmap = self.original_pixmap.transformed(transform)
-        super().setPixmap(zoomed_pixmap)
-        self.setFixedSize(zoomed_pixmap.size())
+        margin = 2 * self.shadow.margin
+        self.setFixedSize(self._scaled_size() + QSize(margin, margin))
+        self.update()
 
         self.zoomChanged.emit(self.zoom_factor)
 
+    def _scaled_size(self) -> QSize:
+        return QSize(
+            int(self.original_pixmap.width() * self.zoom_factor),
+            int(self.original_pixmap.height() * self.zoom_factor),
+        )
+
+    def paintEvent(self, event):
+        if not self.original_pixmap:
+            return
+
+        painter = QPainter(self)
+        offset = self._get_pixmap_offset()
+        self.shadow.paint(painter, QRect(offset, self._scaled_size()))
+
+        painter.translate(offset)
+        painter.scale(self.zoom_factor, self.zoom_factor)
+
+        # Source pixels under the exposed area, scaled with nearest neighbour
+        inverted, _ = painter.transform().inverted()
+        exposed = inverted.mapRect(QRectF(event.rect())).toAlignedRect()
+        source = QRectF(exposed.intersected(self.original_pixmap.rect()))
+
+        painter.drawPixmap(source, self.original_pixmap, source)
+        if self.overlay_pixmap:
+            painter.drawPixmap(source, self.overlay_pixmap, source)
+
     def mousePressEvent(self, event):
         if self.can_click and event.button() == Qt.LeftButton:
             original_pos = self._map_to_original_coords(event.pos())
@@ -254,11 +361,11 @@ class ImageViewer(QLabel):
         return None
 
     def _get_pixmap_offset(self) -> QPoint:
-        if not self.pixmap():
+        if not self.original_pixmap:
             return QPoint(0, 0)
 
         # Get the scaled size
-        scaled_size = self.pixmap().size()
+        scaled_size = self._scaled_size()
 
         # Offset to center
         return QPoint(
@@ -289,5 +396,8 @@ class ScrollImageViewer(QScrollArea):
     def setPixmap(self, pixmap: QPixmap):
         self.image_viewer.setPixmap(pixmap)
 
+    def set_overlay(self, pixmap: QPixmap):
+        self.image_viewer.set_overlay(pixmap)
+
     def toggle_click(self):
         self.image_viewer.toggle_click()
@@ -0,0 +1,70 @@
+import pytest
+
+from musa.model import history, journal
+from musa.model.animation_collection import AnimationCollection
+from musa.model.frame import Frame
+from musa.model.sprite import Sprite
+
+
+@pytest.fixture
+def undo():
+    edits = history.History()
+    history.activate(edits)
+    yield edits
+    history.activate(None)
+
+
+def undo_steps(edits):
+    steps = 0
+    while edits.undo():
+        steps += 1
+    return steps
+
+
+def test_adding_a_built_frame_is_one_step(undo):
+    walk = AnimationCollection().create_animation("walk")
+    undo.clear()
+
+    frame = Frame(name="walk_0")
+    frame.add_sprite(Sprite(name="body"))
+    frame.add_sprites([Sprite(name="head", z_index=1), Sprite(name="leg")])
+    walk.add_frame(frame)
+
+    assert undo_steps(undo) == 1
+    assert len(walk.frames) == 0
+
+    undo.redo()
+    assert walk.frames[0] is frame
+    assert len(frame.sprites) == 3
+
+
+def test_removed_frame_edits_are_not_recorded(undo):
+    walk = AnimationCollection().create_animation("walk")
+    walk.add_frame(Frame(name="walk_0", sprites=[Sprite(name="body")]))
+    frame = walk.frames[0]
+    undo.clear()
+
+    walk.remove_frame(frame.id)
+    frame.update_sprite(frame.sprites[0].id, x=5)
+    assert undo_steps(undo) == 1
+
+    # Back in the animation its edits count again
+    frame.update_sprite(frame.sprites[0].id, x=7)
+    assert undo_steps(undo) == 1
+    assert frame.sprites[0].x == 5
+
+
+def test_detached_frames_are_not_journaled(tmp_path):
+    walk = AnimationCollection().create_animation("walk")
+    edits = journal.Journal(tmp_path / "project.musa.journal")
+    journal.activate(edits)
+    try:
+        frame = Frame(name="walk_0")
+        frame.add_sprites([Sprite(name="body"), Sprite(name="head")])
+        walk.add_frame(frame)
+    finally:
+        journal.activate(None)
+        edits.close()
+
+    records, _ = journal.Journal.read(edits.path)
+    assert [op for op, _ in records] == [journal.Op.INSERT_FRAME]
@@ -0,0 +1,165 @@
+import pytest
+
+from musa.model import journal
+from musa.model.animation_collection import AnimationCollection
+from musa.model.frame import Frame
+from musa.model.project_file import ProjectFile
+from musa.model.sprite import Sprite
+
+
+@pytest.fixture
+def saved(tmp_path):
+    """Collection saved to a project file, edited with a journal recording"""
+    collection = AnimationCollection()
+    walk = collection.create_animation("walk")
+    walk.add_frame(Frame(name="walk_0", sprites=[Sprite(name="body")]))
+    project = ProjectFile.write(tmp_path / "project.musa", collection.list_animations())
+
+    edits = journal.Journal(tmp_path / "project.musa.journal")
+    journal.activate(edits)
+    yield project, collection, edits
+    journal.activate(None)
+    edits.close()
+    project.close()
+
+
+def make_edits(collection):
+    walk = collection.list_animations()[0]
+    frame = walk.frames[0]
+    sprite_id = frame.sprites[0].id
+
+    frame.update_sprite(sprite_id, x=10, y=-3)
+    frame.add_sprite(Sprite(name="head", z_index=2))
+    walk.add_frame(Frame(name="walk_1", ticks=3))
+    collection.update_animation(walk.id, "run")
+    idle = collection.create_animation("idle")
+    idle.add_frame(Frame(name="idle_0"))
+
+
+def state(collection):
+    return [animation.to_dict() for animation in collection.list_animations()]
+
+
+def reopen(project, edits):
+    """Crash and reopen: the last save plus the journal read from disk"""
+    collection = AnimationCollection()
+    collection.load_animations(ProjectFile(project.path).read_animations())
+    return collection, journal.Journal(edits.path)
+
+
+def test_replay_restores_the_edits(saved):
+    project, collection, edits = saved
+    make_edits(collection)
+    edits.flush()
+
+    recovered, recovered_journal = reopen(project, edits)
+    assert recovered.replay_journal(recovered_journal.recovered) == 6
+    assert state(recovered) == state(collection)
+    recovered_journal.close()
+
+
+def test_replay_is_not_journaled_again(saved):
+    project, collection, edits = saved
+    make_edits(collection)
+    edits.flush()
+
+    recovered, recovered_journal = reopen(project, edits)
+    journal.activate(recovered_journal)
+    recovered.replay_journal(recovered_journal.recovered)
+    recovered_journal.close()
+
+    assert len(journal.Journal.read(edits.path)[0]) == 6
+
+
+def test_truncated_record_ends_the_replay(saved):
+    project, collection, edits = saved
+    walk = collection.list_animations()[0]
+    collection.update_animation(walk.id, "run")
+    edits.flush()
+    size = edits.path.stat().st_size
+    expected = state(collection)
+
+    # Crash halfway through writing the next record
+    collection.update_animation(walk.id, "sprint")
+    edits.flush()
+    with open(edits.path, "r+b") as file:
+        file.truncate(size + 5)
+
+    recovered, recovered_journal = reopen(project, edits)
+    assert len(recovered_journal.recovered) == 1
+    recovered.replay_journal(recovered_journal.recovered)
+    assert state(recovered) == expected
+
+    # The torn tail is cut so new records follow the last valid one
+    assert edits.path.stat().st_size == size
+    recovered_journal.append(journal.Op.RENAME_ANIMATION, b"")
+    recovered_journal.close()
+    assert len(journal.Journal.read(edits.path)[0]) == 2
+
+
+def test_corrupt_record_ends_the_replay(saved):
+    project, collection, edits = saved
+    walk = collection.list_animations()[0]
+    collection.update_animation(walk.id, "run")
+    edits.flush()
+    size = edits.path.stat().st_size
+    expected = state(collection)
+
+    collection.update_animation(walk.id, "sprint")
+    collection.update_animation(walk.id, "dash")
+    edits.flush()
+
+    # Flip a byte in the payload of the second record
+    data = bytearray(edits.path.read_bytes())
+    data[size + 20] ^= 0xFF
+    edits.path.write_bytes(bytes(data))
+
+    recovered, recovered_journal = reopen(project, edits)
+    assert len(recovered_journal.recovered) == 1
+    recovered.replay_journal(recovered_journal.recovered)
+    assert state(recovered) == expected
+    recovered_journal.close()
+
+
+def test_values_round_trip(tmp_path):
+    values = [None, 1.5, -2, True, "ñ", b"\x00", [1, [2.0, None]], {"x": (3, "a")}]
+    edits = journal.Journal(tmp_path / "values.journal")
+    journal.activate(edits)
+    journal.record(journal.Op.UPDATE_SPRITE, *values)
+    journal.activate(None)
+    edits.close()
+
+    (record,) = journal.Journal.read(edits.path)[0]
+    assert record == (
+        journal.Op.UPDATE_SPRITE,
+        [None, 1.5, -2, True, "ñ", b"\x00", [1, [2.0, None]], {"x": [3, "a"]}],
+    )
+
+
+def test_unjournaled_value_leaves_the_model_untouched(saved):
+    project, collection, edits = saved
+    frame = collection.list_animations()[0].frames[0]
+    sprite = frame.sprites[0]
+
+    with pytest.raises(TypeError):
+        frame.update_sprite(sprite.id, x=10, name=object())
+    assert (sprite.x, sprite.name) == (0, "body")
+    assert not frame.is_modified
+
+    edits.flush()
+    assert journal.Journal.read(edits.path)[0] == []
+
+
+def test_replay_restores_the_sprite_bank(saved):
+    project, collection, edits = saved
+    index = collection.sprite_bank.add(b"\x89PNG body")
+    assert collection.sprite_bank.add(b"\x89PNG body") == index
+    frame = collection.list_animations()[0].frames[0]
+    frame.update_sprite(frame.sprites[0].id, sprite_index=index)
+    edits.flush()
+
+    recovered, recovered_journal = reopen(project, edits)
+    recovered.replay_journal(recovered_journal.recovered)
+    assert recovered.sprite_bank.images == [b"\x89PNG body"]
+    assert state(recovered) == state(collection)
+    recovered_journal.close()
@@ -0,0 +1,205 @@
+import pytest
+
+from musa.model.animation import Animation
+from musa.model.frame import Frame
+from musa.model.frame_codec import decode_frame, encode_frame
+from musa.model.lazy_frames import LazyFrameList
+from musa.model.project_file import ProjectFile, pack_project
+from musa.model.sprite import Sprite
+
+
+def make_animations():
+    walk = Animation(name="walk")
+    for i in range(3):
+        walk.add_frame(
+            Frame(
+                name=f"walk_{i}",
+                ticks=i + 1,
+                sprites=[
+                    Sprite(name="body", x=i, y=-i, z_index=1, sprite_index=4),
+                    Sprite(name="ñame", h_flip=True, alpha=30, visible=False),
+                ],
+            )
+        )
+    idle = Animation(name="idle", frames=[Frame(name="idle_0")])
+    return [walk, idle]
+
+
+def as_dicts(animations):
+    return [animation.to_dict() for animation in animations]
+
+
+def read_back(path):
+    """Animations as stored in the file at path, fully decoded"""
+    project = ProjectFile(path)
+    try:
+        return as_dicts(project.read_animations())
+    finally:
+        project.close()
+
+
+def test_frame_codec_round_trip():
+    frame = make_animations()[0].frames[1]
+    assert decode_frame(encode_frame(frame)).to_dict() == frame.to_dict()
+
+
+def test_pack_project_round_trip(tmp_path):
+    animations = make_animations()
+    data = pack_project(
+        [
+            (
+                animation.id.bytes,
+                animation.name,
+                [(frame.id.bytes, encode_frame(frame)) for frame in animation.frames],
+            )
+            for animation in animations
+        ]
+    )
+    path = tmp_path / "packed.musa"
+    path.write_bytes(data)
+
+    project = ProjectFile(path)
+    assert as_dicts(project.read_animations()) == as_dicts(animations)
+    project.close()
+
+
+def test_write_and_read_animations(tmp_path):
+    animations = make_animations()
+    expected = as_dicts(animations)
+
+    project = ProjectFile.write(tmp_path / "project.musa", animations)
+
+    # The written frames now come from the file
+    assert all(isinstance(a.frames, LazyFrameList) for a in animations)
+    assert as_dicts(animations) == expected
+    project.close()
+
+    project = ProjectFile(tmp_path / "project.musa")
+    walk = project.read_animations()[0]
+    assert not any(walk.frames.is_loaded(row) for row in range(3))
+    assert walk.total_ticks == 6
+    project.close()
+
+    assert read_back(tmp_path / "project.musa") == expected
+
+
+def test_write_over_the_open_file(tmp_path):
+    path = tmp_path / "project.musa"
+    ProjectFile.write(path, make_animations()).close()
+
+    project = ProjectFile(path)
+    animations = project.read_animations()
+    expected = as_dicts(animations)
+
+    # Undecoded frames are copied from the file being replaced
+    project = ProjectFile.write(path, animations)
+    assert as_dicts(animations) == expected
+    assert as_dicts(project.read_animations()) == expected
+    project.close()
+
+
+def test_read_rejects_other_files(tmp_path):
+    path = tmp_path / "other.musa"
+    path.write_bytes(b"NOPE" + bytes(64))
+
+    with pytest.raises(ValueError):
+        ProjectFile(path)
+
+
+@pytest.fixture
+def saved_project(tmp_path):
+    """Project reopened from disk with one frame edited and saved since"""
+    path = tmp_path / "project.musa"
+    ProjectFile.write(path, make_animations()).close()
+
+    project = ProjectFile(path)
+    animations = project.read_animations()
+    walk = animations[0]
+    walk.update_frame(walk.frames[1].id, name="edited")
+    walk.frames[1].update_sprite(walk.frames[1].sprites[0].id, x=42)
+    dirty = {animation.id: animation.commit_frame_changes() for animation in animations}
+
+    project.save(animations, dirty)
+    yield project, animations
+    project.close()
+
+
+def test_save_appends_only_modified_frames(tmp_path):
+    path = tmp_path / "project.musa"
+    ProjectFile.write(path, make_animations()).close()
+    size = path.stat().st_size
+
+    project = ProjectFile(path)
+    animations = project.read_animations()
+    walk = animations[0]
+    untouched = walk.frames.location(0)
+    walk.update_frame(walk.frames[1].id, name="edited")
+    dirty = {animation.id: animation.commit_frame_changes() for animation in animations}
+    project.save(animations, dirty)
+
+    assert walk.frames.location(0) == untouched
+    assert walk.frames.location(1)[0] >= size
+    assert project.garbage > 0
+    assert read_back(path) == as_dicts(animations)
+    project.close()
+
+
+def test_compaction_relocates_frames(saved_project, tmp_path):
+    project, animations = saved_project
+    expected = read_back(project.path)
+    tmp = tmp_path / "project.musa.compact"
+
+    relocations = ProjectFile.compact(project.path, tmp)
+    assert project.finish_compaction(project.generation, tmp, relocations)
+
+    assert project.garbage == 0
+    assert not tmp.exists()
+
+    # Frames never decoded read their chunks at the new locations
+    assert not animations[1].frames.is_loaded(0)
+    assert as_dicts(animations) == expected
+    assert read_back(project.path) == expected
+
+
+def test_stale_compaction_is_dropped(saved_project, tmp_path):
+    project, animations = saved_project
+    tmp = tmp_path / "project.musa.compact"
+
+    generation = project.generation
+    relocations = ProjectFile.compact(project.path, tmp)
+
+    # Saved again while compacting, the copy misses the new chunks
+    walk = animations[0]
+    walk.update_frame(walk.frames[2].id, name="saved meanwhile")
+    dirty = {animation.id: animation.commit_frame_changes() for animation in animations}
+    project.save(animations, dirty)
+    expected = as_dicts(animations)
+
+    assert not project.finish_compaction(generation, tmp, relocations)
+    assert not tmp.exists()
+    assert as_dicts(animations) == expected
+    assert read_back(project.path) == expected
+
+
+def test_sprite_bank_images_are_saved(tmp_path):
+    path = tmp_path / "project.musa"
+    images = [b"\x89PNG one", b"\x89PNG two"]
+    ProjectFile.write(path, make_animations(), images).close()
+
+    # A save appends only the images added since
+    project = ProjectFile(path)
+    assert project.read_images() == images
+    saved = list(project.image_locations)
+    animations = project.read_animations()
+    project.save(animations, {}, images + [b"\x89PNG three"])
+    assert project.image_locations[:2] == saved
+    project.close()
+
+    project = ProjectFile(path)
+    assert project.read_images() == images + [b"\x89PNG three"]
+    tmp = tmp_path / "project.musa.compact"
+    relocations = ProjectFile.compact(project.path, tmp)
+    assert project.finish_compaction(project.generation, tmp, relocations)
+    assert project.garbage == 0
+    assert project.read_images() == images + [b"\x89PNG three"]
+    project.close()